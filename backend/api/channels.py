@@ -0,0 +1,126 @@
+"""
+Réputation des chaînes YouTube.
+Statistiques persistées par chaîne (vidéos acceptées / rejetées, score moyen)
+permettant d'écarter les chaînes connues comme hors-sujet avant de payer
+l'appel `videos` de l'API.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+# Nombre d'observations minimum avant de juger une chaîne
+MIN_OBSERVATIONS = 5
+# Chaîne ignorée si au moins 80% de ses vidéos ont été rejetées (langue)
+SKIP_REJECT_RATIO = 0.8
+# Chaîne différée en fin de run si son score moyen est sous ce seuil
+LOW_MEAN_SCORE = 20.0
+# Une chaîne ignorée est réévaluée après ce délai sans observation
+SKIP_TTL_DAYS = 30
+# Nombre max d'IDs vidéos mémorisés par chaîne (évite le double comptage entre runs)
+MAX_TRACKED_VIDEOS = 200
+
+
+def _entry(stats: dict[str, Any], channel_id: str, channel_title: str) -> dict[str, Any]:
+    entry = stats.setdefault(channel_id, {"title": channel_title, "accepted": {}, "rejected": []})
+    if channel_title:
+        entry["title"] = channel_title
+    entry["updated_at"] = datetime.now(timezone.utc).isoformat()
+    return entry
+
+
+def _trim(entry: dict[str, Any]) -> None:
+    accepted = entry["accepted"]
+    while len(accepted) > MAX_TRACKED_VIDEOS:
+        del accepted[next(iter(accepted))]
+    entry["rejected"] = entry["rejected"][-MAX_TRACKED_VIDEOS:]
+
+
+def record_rejected(stats: dict[str, Any], channel_id: str, channel_title: str, video_id: str) -> None:
+    """Enregistre une vidéo écartée par le filtre de langue."""
+    if not channel_id:
+        return
+    entry = _entry(stats, channel_id, channel_title)
+    entry["accepted"].pop(video_id, None)
+    if video_id not in entry["rejected"]:
+        entry["rejected"].append(video_id)
+    _trim(entry)
+
+
+def record_accepted(stats: dict[str, Any], videos: list[dict[str, Any]]) -> None:
+    """Enregistre les vidéos scorées (clés `channel_id`, `channel`, `id`, `score`)."""
+    for v in videos:
+        channel_id = v.get("channel_id", "")
+        if not channel_id:
+            continue
+        entry = _entry(stats, channel_id, v.get("channel", ""))
+        if v["id"] in entry["rejected"]:
+            entry["rejected"].remove(v["id"])
+        entry["accepted"][v["id"]] = v.get("score", 0.0)
+        _trim(entry)
+
+
+def summarize(channel_id: str, entry: dict[str, Any]) -> dict[str, Any]:
+    """Agrégats d'une chaîne : compteurs, score moyen et verdict."""
+    scores = list(entry.get("accepted", {}).values())
+    accepted = len(scores)
+    rejected = len(entry.get("rejected", []))
+    mean = round(sum(scores) / accepted, 1) if accepted else 0.0
+    summary = {
+        "channel_id": channel_id,
+        "title": entry.get("title", ""),
+        "accepted_count": accepted,
+        "rejected_count": rejected,
+        "mean_score": mean,
+        "updated_at": entry.get("updated_at"),
+    }
+    summary["verdict"] = _verdict(summary)
+    return summary
+
+
+def _verdict(summary: dict[str, Any]) -> str:
+    """Retourne "skip", "deprioritize" ou "ok"."""
+    accepted = summary["accepted_count"]
+    rejected = summary["rejected_count"]
+    total = accepted + rejected
+    if total < MIN_OBSERVATIONS:
+        return "ok"
+
+    updated_at = summary.get("updated_at")
+    if updated_at:
+        age = datetime.now(timezone.utc) - datetime.fromisoformat(updated_at)
+        if age > timedelta(days=SKIP_TTL_DAYS):
+            return "ok"
+
+    if rejected / total >= SKIP_REJECT_RATIO:
+        return "skip"
+    if accepted and summary["mean_score"] < LOW_MEAN_SCORE:
+        return "deprioritize"
+    return "ok"
+
+
+def channel_verdict(stats: dict[str, Any], channel_id: str) -> str:
+    """Verdict pour une chaîne ("ok" si inconnue)."""
+    entry = stats.get(channel_id)
+    if entry is None:
+        return "ok"
+    return summarize(channel_id, entry)["verdict"]
+
+
+def prefilter(
+    candidates: list[dict[str, str]], stats: dict[str, Any]
+) -> tuple[list[dict[str, str]], list[dict[str, str]]]:
+    """
+    Trie les candidats (issus de `search_videos`) selon la réputation de leur chaîne.
+    Retourne (à détailler maintenant, à différer) ; les chaînes à ignorer sont écartées.
+    """
+    kept: list[dict[str, str]] = []
+    deferred: list[dict[str, str]] = []
+    for c in candidates:
+        verdict = channel_verdict(stats, c.get("channel_id", ""))
+        if verdict == "skip":
+            continue
+        if verdict == "deprioritize":
+            deferred.append(c)
+        else:
+            kept.append(c)
+    return kept, deferred
@@ -2,17 +2,39 @@
 API FastAPI — Veille YouTube Kubernetes.
 """
 
+import asyncio
 import logging
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from typing import Optional
 
-from fastapi import FastAPI, Query, HTTPException, BackgroundTasks
+from fastapi import FastAPI, Query, HTTPException, BackgroundTasks, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
-from .models import Video, VideoList, RefreshResult, RefreshRequest
-from .storage import load_videos, save_videos, get_last_updated, load_config, save_config, load_quota_status, save_quota_status
+from .models import (
+    Video, VideoList, RefreshResult, RefreshRequest, ChannelStats, RelatedVideo, RescoreResult,
+)
+from .storage import (
+    catalog_lock, load_videos, get_last_updated, load_config, save_config, load_catalog_meta,
+    load_quota_status, save_quota_status, load_channel_stats, save_channel_stats,
+    load_schedule, load_related, load_related_lookup, load_video_lookup,
+    save_related,
+)
+from .channels import record_accepted, summarize
+from .profiling import (
+    SamplingProfiler, end_request_profile, profiled, profiling_allowed, save_profile,
+    slow_requests, start_request_profile,
+)
 from .youtube_client import fetch_all_videos, QuotaExceededError
-from scoring.scorer import score_video
+from .rescoring import persist_catalog, rescore_catalog, rules_fingerprint, scores_stale
+from .schedule import upcoming
+from .thumbnails import (
+    DEFAULT_WIDTH, ThumbnailError, get_cached_thumbnail, get_thumbnail,
+    is_valid_video_id, prefetch_thumbnails,
+)
+from scoring.similarity import compute_related
 
 logging.basicConfig(
     level=logging.INFO,
@@ -20,43 +42,105 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Règles de scoring modifiées depuis le dernier scoring : rescoring local
+    try:
+        if load_videos() and scores_stale():
+            logger.info("Règles de scoring modifiées — rescoring du catalogue")
+            rescore_catalog()
+    except Exception as exc:
+        logger.error("Erreur lors du rescoring : %s", exc)
+    yield
+
+
 app = FastAPI(
     title="YTVeille",
     description="API de veille automatique des meilleures vidéos YouTube en français",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
+_refresh_running = False
+
+
+@app.middleware("http")
+async def profiling_middleware(request: Request, call_next):
+    """Chronomètre chaque requête ; renvoie un profil collapsed si ?profile=1 est autorisé."""
+    want_profile = (
+        request.query_params.get("profile") == "1"
+        and profiling_allowed(request.headers.get("X-Profile-Token"))
+    )
+    holder, token = start_request_profile() if want_profile else (None, None)
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        if token is not None:
+            end_request_profile(token)
+    elapsed = time.perf_counter() - start
+
+    params = {k: v for k, v in request.query_params.items() if k != "profile"}
+    slow_requests.record(request.method, request.url.path, params, elapsed, response.status_code)
+
+    if holder and "profiler" in holder:
+        collapsed = holder["profiler"].collapsed()
+        path = save_profile(request.url.path, collapsed)
+        logger.info("Profil de %s enregistré : %s", request.url.path, path)
+        return PlainTextResponse(
+            collapsed,
+            headers={
+                "X-Profile-Path": str(path),
+                "X-Response-Time-Ms": f"{elapsed * 1000:.1f}",
+                "X-Profiled-Status": str(response.status_code),
+            },
+        )
+    return response
+
+
+# Ajouté après le middleware de profilage pour l'englober : les profils renvoyés
+# à la place de la réponse portent aussi les en-têtes CORS
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Profile-Path", "X-Response-Time-Ms", "X-Profiled-Status"],
 )
 
-_refresh_running = False
-
 
-def _run_refresh() -> RefreshResult:
-    """Pipeline : fetch → score → persist."""
-    import asyncio
+def _run_refresh(profile: bool = False) -> RefreshResult:
+    """
+    Pipeline : fetch → score → persist → miniatures.
+    Si profile=True, un profil collapsed de l'exécution est écrit sous data/profiles/.
+    """
+    if profile:
+        with SamplingProfiler() as prof:
+            result = _run_refresh()
+        path = save_profile("refresh", prof.collapsed())
+        logger.info("Profil du refresh enregistré : %s (%.1fs)", path, prof.duration)
+        return result
 
     config = load_config()
     queries = config.get("queries")
-    raw = asyncio.run(fetch_all_videos(queries))
+    channel_stats = load_channel_stats()
+    raw = asyncio.run(fetch_all_videos(queries, channel_stats))
     logger.info("Vidéos récupérées : %d", len(raw))
 
-    scored = []
-    for v in raw:
-        s, topics = score_video(v)
-        v["score"] = s
-        v["topics"] = topics
-        scored.append(v)
-
-    # Trier par score décroissant
-    scored.sort(key=lambda x: x["score"], reverse=True)
-    save_videos(scored)
+    # Score (trié décroissant) et persistance des données brutes + dérivées
+    with catalog_lock():
+        scored = persist_catalog(raw)
     logger.info("Vidéos sauvegardées : %d", len(scored))
 
+    record_accepted(channel_stats, scored)
+    save_channel_stats(channel_stats)
+
+    save_related(compute_related(scored, load_related()))
+
+    cached = asyncio.run(prefetch_thumbnails(scored))
+    logger.info("Miniatures préchargées : %d", cached)
+
     return RefreshResult(
         fetched=len(raw),
         scored=len(scored),
@@ -66,6 +150,7 @@ def _run_refresh() -> RefreshResult:
 
 
 @app.get("/api/videos", response_model=VideoList)
+@profiled
 def list_videos(
     q: Optional[str] = Query(None),
     min_score: float = Query(0.0, ge=0, le=100),
@@ -120,6 +205,7 @@ def list_videos(
 
 
 @app.get("/api/videos/{video_id}", response_model=Video)
+@profiled
 def get_video(video_id: str):
     """Détail d'une vidéo par ID."""
     all_videos = load_videos()
@@ -129,26 +215,110 @@ def get_video(video_id: str):
     raise HTTPException(status_code=404, detail="Vidéo non trouvée")
 
 
+@app.get("/api/videos/{video_id}/related", response_model=list[RelatedVideo])
+@profiled
+def get_related_videos(video_id: str, limit: int = Query(10, ge=1, le=50)):
+    """Vidéos au contenu proche (TF-IDF titre + tags), depuis l'index précalculé."""
+    index, by_id = load_related_lookup()
+    neighbours = index.get(video_id)
+    if neighbours is None:
+        raise HTTPException(status_code=404, detail="Vidéo non trouvée")
+    return [
+        RelatedVideo(**by_id[nid], similarity=sim)
+        for nid, sim in neighbours[:limit]
+        if nid in by_id
+    ]
+
+
+@app.get("/api/thumbnails/{video_id}")
+@profiled
+async def get_video_thumbnail(video_id: str, w: int = Query(DEFAULT_WIDTH, ge=1, le=1280)):
+    """Miniature WebP redimensionnée, servie depuis le cache disque local."""
+    if not is_valid_video_id(video_id):
+        raise HTTPException(status_code=404, detail="Vidéo non trouvée")
+
+    # Accès disque hors de la boucle d'événements
+    data = await asyncio.to_thread(get_cached_thumbnail, video_id, w)
+    if data is None:
+        video = (await asyncio.to_thread(load_video_lookup)).get(video_id)
+        if video is None:
+            raise HTTPException(status_code=404, detail="Vidéo non trouvée")
+        try:
+            data = await get_thumbnail(video_id, video.get("thumbnail_url", ""), w)
+        except ThumbnailError as exc:
+            logger.warning("Miniature indisponible : %s", exc)
+            raise HTTPException(status_code=502, detail="Miniature indisponible")
+
+    return Response(
+        content=data,
+        media_type="image/webp",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
+
+
+@app.get("/api/channels", response_model=list[ChannelStats])
+@profiled
+def list_channels(
+    verdict: Optional[str] = Query(None, pattern="^(ok|deprioritize|skip)$"),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """Réputation des chaînes observées, triées par score moyen décroissant."""
+    channels = [summarize(cid, entry) for cid, entry in load_channel_stats().items()]
+    if verdict:
+        channels = [c for c in channels if c["verdict"] == verdict]
+    channels.sort(key=lambda c: (c["mean_score"], c["accepted_count"]), reverse=True)
+    return [ChannelStats(**c) for c in channels[:limit]]
+
+
+@app.get("/api/schedule")
+@profiled
+def get_schedule():
+    """Planning à venir du worker (prochaine exécution et rendement par requête)."""
+    state = load_schedule()
+    return {
+        "paused_until": state.get("paused_until"),
+        "items": upcoming(state),
+    }
+
+
+@app.get("/api/debug/slow-requests")
+def get_slow_requests(request: Request):
+    """Requêtes les plus lentes des dernières 24h (profilage requis)."""
+    if not profiling_allowed(request.headers.get("X-Profile-Token")):
+        raise HTTPException(status_code=403, detail="Profilage non autorisé")
+    return slow_requests.items()
+
+
 @app.get("/api/config")
+@profiled
 def get_config():
     """Retourne la configuration de recherche actuelle."""
     return load_config()
 
 
 @app.post("/api/refresh", response_model=RefreshResult)
-def refresh(background_tasks: BackgroundTasks, body: Optional[RefreshRequest] = None):
-    """Déclenche une mise à jour. Si body.queries fourni, sauvegarde la config."""
+def refresh(
+    request: Request, background_tasks: BackgroundTasks, body: Optional[RefreshRequest] = None
+):
+    """
+    Déclenche une mise à jour. Si body.queries fourni, sauvegarde la config.
+    Avec ?profile=1 (profilage autorisé), le profil du pipeline est écrit sous data/profiles/.
+    """
     global _refresh_running
     if _refresh_running:
         raise HTTPException(status_code=409, detail="Un refresh est déjà en cours")
     if body and body.queries:
         save_config({"queries": body.queries})
+    profile = (
+        request.query_params.get("profile") == "1"
+        and profiling_allowed(request.headers.get("X-Profile-Token"))
+    )
     _refresh_running = True
 
     def _wrapped():
         global _refresh_running
         try:
-            _run_refresh()
+            _run_refresh(profile=profile)
             save_quota_status(False)
         except QuotaExceededError:
             save_quota_status(True)
@@ -167,7 +337,26 @@ def refresh(background_tasks: BackgroundTasks, body: Optional[RefreshRequest] =
     )
 
 
+@app.post("/api/rescore", response_model=RescoreResult)
+def rescore():
+    """Recalcule scores et topics depuis les données locales (sans appel YouTube)."""
+    global _refresh_running
+    if _refresh_running:
+        raise HTTPException(status_code=409, detail="Un refresh est déjà en cours")
+    _refresh_running = True
+    try:
+        scored = rescore_catalog()
+    finally:
+        _refresh_running = False
+    return RescoreResult(
+        rescored=len(scored),
+        scoring_fingerprint=rules_fingerprint(),
+        timestamp=datetime.now(timezone.utc),
+    )
+
+
 @app.get("/api/status")
+@profiled
 def status():
     """État de l'API et date de dernière mise à jour."""
     last = get_last_updated()
@@ -181,4 +370,6 @@ def status():
         "queries": load_config().get("queries", []),
         "quota_exceeded": quota.get("exceeded", False),
         "quota_exceeded_at": quota.get("exceeded_at"),
+        "scoring_fingerprint": load_catalog_meta().get("scoring_fingerprint"),
+        "scoring_stale": scores_stale(),
     }
@@ -7,6 +7,7 @@ class Video(BaseModel):
     id: str
     title: str
     channel: str
+    channel_id: str = ""
     published_at: datetime
     duration_seconds: int
     view_count: int
@@ -19,6 +20,20 @@ class Video(BaseModel):
     topics: List[str] = []
 
 
+class RelatedVideo(Video):
+    similarity: float
+
+
+class ChannelStats(BaseModel):
+    channel_id: str
+    title: str
+    accepted_count: int
+    rejected_count: int
+    mean_score: float
+    verdict: str
+    updated_at: Optional[datetime] = None
+
+
 class VideoList(BaseModel):
     total: int
     page: int
@@ -43,3 +58,9 @@ class RefreshResult(BaseModel):
     scored: int
     stored: int
     timestamp: datetime
+
+
+class RescoreResult(BaseModel):
+    rescored: int
+    scoring_fingerprint: str
+    timestamp: datetime
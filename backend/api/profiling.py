@@ -0,0 +1,176 @@
+"""
+Profilage à la demande des requêtes API et du pipeline.
+
+Un profileur par échantillonnage (pile du thread ciblé relevée toutes les
+quelques millisecondes) produit des piles au format "collapsed", lisible
+directement par flamegraph.pl, speedscope ou inferno.
+
+Le profilage d'une requête est activé par `?profile=1`, à condition que
+PROFILING_ENABLED=1 ou que l'en-tête X-Profile-Token corresponde à PROFILING_TOKEN.
+"""
+
+import contextvars
+import functools
+import hmac
+import inspect
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+from .storage import PROFILES_DIR
+
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "") == "1"
+PROFILING_TOKEN = os.environ.get("PROFILING_TOKEN", "")
+SAMPLE_INTERVAL = float(os.environ.get("PROFILING_INTERVAL", 0.005))
+# Profils conservés sur disque (les plus anciens sont supprimés)
+MAX_STORED_PROFILES = 50
+# Requêtes lentes conservées, sur une fenêtre glissante
+SLOW_REQUESTS_KEPT = int(os.environ.get("SLOW_REQUESTS_KEPT", 20))
+SLOW_REQUESTS_WINDOW_S = 24 * 3600
+
+# Dict partagé entre le middleware et la route quand un profil est demandé, None sinon
+_profile_request: contextvars.ContextVar[dict[str, Any] | None] = contextvars.ContextVar(
+    "profile_request", default=None
+)
+
+
+def profiling_allowed(token: str | None) -> bool:
+    """Profilage autorisé globalement, ou via le jeton d'administration."""
+    if PROFILING_ENABLED:
+        return True
+    return bool(PROFILING_TOKEN) and bool(token) and hmac.compare_digest(token, PROFILING_TOKEN)
+
+
+class SamplingProfiler:
+    """Échantillonne la pile d'un thread et agrège les piles identiques."""
+
+    def __init__(self, thread_id: int | None = None, interval: float = SAMPLE_INTERVAL):
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._start = 0.0
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{Path(code.co_filename).stem}.{code.co_qualname}")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def __enter__(self) -> "SamplingProfiler":
+        self._start = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self._start
+
+    def collapsed(self) -> str:
+        """Piles au format collapsed : "frame1;frame2;frame3 nb_échantillons"."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common()) + "\n"
+
+
+def save_profile(name: str, collapsed: str) -> Path:
+    """Écrit un profil collapsed dans PROFILES_DIR et purge les plus anciens."""
+    PROFILES_DIR.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in name).strip("_")
+    path = PROFILES_DIR / f"{stamp}-{safe}.collapsed"
+    path.write_text(collapsed, encoding="utf-8")
+
+    profiles = sorted(PROFILES_DIR.glob("*.collapsed"))
+    for old in profiles[:-MAX_STORED_PROFILES]:
+        old.unlink(missing_ok=True)
+    return path
+
+
+def start_request_profile() -> tuple[dict[str, Any], contextvars.Token]:
+    """Marque la requête courante comme à profiler (appelé par le middleware)."""
+    holder: dict[str, Any] = {}
+    return holder, _profile_request.set(holder)
+
+
+def end_request_profile(token: contextvars.Token) -> None:
+    _profile_request.reset(token)
+
+
+def profiled(func: Callable) -> Callable:
+    """
+    Décorateur de route : si la requête courante demande un profil, exécute la
+    route sous SamplingProfiler dans son propre thread (threadpool ou boucle).
+    """
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            holder = _profile_request.get()
+            if holder is None:
+                return await func(*args, **kwargs)
+            with SamplingProfiler() as prof:
+                result = await func(*args, **kwargs)
+            holder["profiler"] = prof
+            return result
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        holder = _profile_request.get()
+        if holder is None:
+            return func(*args, **kwargs)
+        with SamplingProfiler() as prof:
+            result = func(*args, **kwargs)
+        holder["profiler"] = prof
+        return result
+    return wrapper
+
+
+class SlowRequestLog:
+    """Les N requêtes les plus lentes sur une fenêtre glissante."""
+
+    def __init__(self, size: int = SLOW_REQUESTS_KEPT, window_s: float = SLOW_REQUESTS_WINDOW_S):
+        self.size = size
+        self.window_s = window_s
+        self._entries: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def record(self, method: str, path: str, params: dict[str, str], duration_s: float, status: int) -> None:
+        now = time.time()
+        with self._lock:
+            cutoff = now - self.window_s
+            entries = [e for e in self._entries if e["ts"] >= cutoff]
+            if len(entries) >= self.size and duration_s <= entries[-1]["duration_ms"] / 1000:
+                self._entries = entries
+                return
+            entries.append({
+                "ts": now,
+                "at": datetime.fromtimestamp(now, timezone.utc).isoformat(),
+                "method": method,
+                "path": path,
+                "params": params,
+                "status": status,
+                "duration_ms": round(duration_s * 1000, 2),
+            })
+            entries.sort(key=lambda e: e["duration_ms"], reverse=True)
+            self._entries = entries[: self.size]
+
+    def items(self) -> list[dict[str, Any]]:
+        with self._lock:
+            return [{k: v for k, v in e.items() if k != "ts"} for e in self._entries]
+
+
+slow_requests = SlowRequestLog()
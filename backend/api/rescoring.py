@@ -0,0 +1,116 @@
+"""
+Scoring du catalogue à partir des données brutes stockées.
+
+Les champs récupérés sur YouTube (raw_videos.json) sont stockés séparément
+des champs dérivés (score, topics) du catalogue servi (videos.json). Chaque
+catalogue est associé à l'empreinte des règles de scoring qui l'ont produit :
+si scoring/keywords.py ou scoring/scorer.py change, le catalogue peut être
+rescoré en local, sans appel réseau ni quota.
+
+    python -m api.rescoring        # rescoring manuel
+"""
+
+import functools
+import hashlib
+import inspect
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any
+
+from scoring import keywords, scorer
+from scoring.scorer import score_video
+
+from .storage import (
+    catalog_lock, load_catalog_meta, load_raw_videos, load_videos, save_catalog_meta,
+    save_raw_videos, save_videos,
+)
+
+logger = logging.getLogger(__name__)
+
+DERIVED_FIELDS = ("score", "topics")
+# En deçà, le coût de démarrage des processus dépasse le gain
+PARALLEL_MIN_VIDEOS = 5000
+CHUNK_SIZE = 2000
+RESCORE_WORKERS = int(os.environ.get("RESCORE_WORKERS", 0)) or os.cpu_count() or 1
+
+
+@functools.lru_cache(maxsize=1)
+def rules_fingerprint() -> str:
+    """
+    Empreinte des règles de scoring (sources des mots-clés et du scorer).
+    Calculée une fois par processus : c'est le code chargé qui score.
+    """
+    h = hashlib.sha256()
+    for module in (keywords, scorer):
+        h.update(inspect.getsource(module).encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+def strip_derived(video: dict[str, Any]) -> dict[str, Any]:
+    """Retourne les seuls champs bruts d'une vidéo."""
+    return {k: v for k, v in video.items() if k not in DERIVED_FIELDS}
+
+
+def _score_chunk(videos: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    scored = []
+    for v in videos:
+        s, topics = score_video(v)
+        scored.append({**v, "score": s, "topics": topics})
+    return scored
+
+
+def score_all(raw_videos: list[dict[str, Any]], workers: int = RESCORE_WORKERS) -> list[dict[str, Any]]:
+    """Score toutes les vidéos (en parallèle pour les gros catalogues), triées par score décroissant."""
+    if workers > 1 and len(raw_videos) >= PARALLEL_MIN_VIDEOS:
+        chunks = [raw_videos[i : i + CHUNK_SIZE] for i in range(0, len(raw_videos), CHUNK_SIZE)]
+        # spawn : appelé depuis des processus multi-threads (threadpool uvicorn), où fork est risqué
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            scored = [v for part in pool.map(_score_chunk, chunks) for v in part]
+    else:
+        scored = _score_chunk(raw_videos)
+    scored.sort(key=lambda x: x["score"], reverse=True)
+    return scored
+
+
+def persist_catalog(raw_videos: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Score puis persiste données brutes, catalogue et empreinte des règles."""
+    raw_videos = [strip_derived(v) for v in raw_videos]
+    scored = score_all(raw_videos)
+    save_raw_videos(raw_videos)
+    save_videos(scored)
+    save_catalog_meta({
+        "scoring_fingerprint": rules_fingerprint(),
+        "scored_at": datetime.now(timezone.utc).isoformat(),
+        "video_count": len(scored),
+    })
+    return scored
+
+
+def scores_stale() -> bool:
+    """Vrai si le catalogue a été scoré avec d'autres règles que celles du code actuel."""
+    meta = load_catalog_meta()
+    return meta.get("scoring_fingerprint") != rules_fingerprint()
+
+
+def rescore_catalog() -> list[dict[str, Any]]:
+    """
+    Recalcule scores et topics de tout le catalogue depuis les données locales.
+    Un catalogue antérieur à raw_videos.json est migré depuis videos.json.
+    Lecture et écriture sous verrou : une fusion du worker ne peut pas s'intercaler.
+    """
+    with catalog_lock():
+        raw = load_raw_videos()
+        if raw is None:
+            raw = [strip_derived(v) for v in load_videos()]
+        scored = persist_catalog(raw)
+    logger.info("Catalogue rescoré : %d vidéos (règles %s)", len(scored), rules_fingerprint())
+    return scored
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    rescore_catalog()
@@ -0,0 +1,146 @@
+"""
+Planification adaptative des requêtes de recherche.
+
+Chaque requête a son propre intervalle, ajusté selon son rendement
+(nouvelles vidéos par exécution) : les requêtes productives sont relancées
+plus souvent, les stériles de moins en moins. Les exécutions sont étalées
+dans la journée (jitter) et plafonnées par un débit global pour éviter
+le 403 de quota en rafale.
+
+L'état est un dict sérialisable en JSON (persisté via api.storage) :
+    {
+        "queries": {query: {"interval_hours", "yield_avg", "last_run", "last_new", "next_run"}},
+        "recent_runs": [iso, ...],
+        "paused_until": iso | None,
+    }
+"""
+
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Any
+
+MIN_INTERVAL_HOURS = 6.0
+MAX_INTERVAL_HOURS = 7 * 24.0
+DEFAULT_INTERVAL_HOURS = 24.0
+# Nouvelles vidéos par exécution visées : au-delà l'intervalle raccourcit, en deçà il s'allonge
+TARGET_YIELD = 5.0
+# Lissage exponentiel du rendement
+YIELD_SMOOTHING = 0.3
+# Variation aléatoire de ±15% sur chaque intervalle
+JITTER = 0.15
+# Heure UTC de reprise après un 403 (minuit heure du Pacifique, marge DST incluse)
+QUOTA_RESET_HOUR_UTC = 9
+
+MAX_SEARCHES_PER_HOUR = int(os.environ.get("MAX_SEARCHES_PER_HOUR", 3))
+
+
+def _iso(dt: datetime) -> str:
+    return dt.isoformat()
+
+
+def _parse(value: str) -> datetime:
+    return datetime.fromisoformat(value)
+
+
+def _jittered(hours: float, rng: random.Random) -> timedelta:
+    return timedelta(hours=hours * (1 + rng.uniform(-JITTER, JITTER)))
+
+
+def sync_queries(state: dict[str, Any], queries: list[str], now: datetime, rng: random.Random) -> None:
+    """
+    Aligne l'état sur la configuration : retire les requêtes supprimées et
+    planifie les nouvelles, étalées au rythme du débit global.
+    """
+    known = state["queries"]
+    for q in list(known):
+        if q not in queries:
+            del known[q]
+
+    spacing = 3600 / max(MAX_SEARCHES_PER_HOUR, 1)
+    added = 0
+    for q in queries:
+        if q in known:
+            continue
+        offset = added * spacing + rng.uniform(0, spacing * JITTER)
+        known[q] = {
+            "interval_hours": DEFAULT_INTERVAL_HOURS,
+            "yield_avg": TARGET_YIELD,
+            "last_run": None,
+            "last_new": None,
+            "next_run": _iso(now + timedelta(seconds=offset)),
+        }
+        added += 1
+
+
+def next_interval(interval_hours: float, yield_avg: float) -> float:
+    """Nouvel intervalle : divisé jusqu'à 2 si rendement élevé, multiplié jusqu'à 2 si faible."""
+    factor = TARGET_YIELD / max(yield_avg, 0.01)
+    factor = min(max(factor, 0.5), 2.0)
+    return min(max(interval_hours * factor, MIN_INTERVAL_HOURS), MAX_INTERVAL_HOURS)
+
+
+def record_run(
+    state: dict[str, Any], query: str, new_count: int, now: datetime, rng: random.Random
+) -> None:
+    """Met à jour le rendement et replanifie une requête après exécution."""
+    entry = state["queries"].get(query)
+    if entry is None:
+        return
+    entry["yield_avg"] = round(
+        (1 - YIELD_SMOOTHING) * entry["yield_avg"] + YIELD_SMOOTHING * new_count, 3
+    )
+    entry["interval_hours"] = round(next_interval(entry["interval_hours"], entry["yield_avg"]), 2)
+    entry["last_run"] = _iso(now)
+    entry["last_new"] = new_count
+    entry["next_run"] = _iso(now + _jittered(entry["interval_hours"], rng))
+    record_attempt(state, now)
+
+
+def record_attempt(state: dict[str, Any], now: datetime) -> None:
+    """Compte une recherche dans le débit global (y compris une recherche en erreur)."""
+    state["recent_runs"].append(_iso(now))
+
+
+def allowance(state: dict[str, Any], now: datetime) -> int:
+    """Nombre de recherches encore autorisées sur l'heure glissante."""
+    cutoff = now - timedelta(hours=1)
+    state["recent_runs"] = [r for r in state["recent_runs"] if _parse(r) > cutoff]
+    return max(MAX_SEARCHES_PER_HOUR - len(state["recent_runs"]), 0)
+
+
+def is_paused(state: dict[str, Any], now: datetime) -> bool:
+    paused_until = state.get("paused_until")
+    return bool(paused_until) and _parse(paused_until) > now
+
+
+def pause_until_quota_reset(state: dict[str, Any], now: datetime) -> None:
+    """Suspend toutes les requêtes jusqu'au prochain renouvellement du quota."""
+    reset = now.replace(hour=QUOTA_RESET_HOUR_UTC, minute=0, second=0, microsecond=0)
+    if reset <= now:
+        reset += timedelta(days=1)
+    state["paused_until"] = _iso(reset)
+
+
+def due_queries(state: dict[str, Any], now: datetime) -> list[str]:
+    """Requêtes arrivées à échéance, les plus en retard d'abord."""
+    if is_paused(state, now):
+        return []
+    due = [
+        (_parse(e["next_run"]), q)
+        for q, e in state["queries"].items()
+        if _parse(e["next_run"]) <= now
+    ]
+    due.sort()
+    return [q for _, q in due[: allowance(state, now)]]
+
+
+def upcoming(state: dict[str, Any]) -> list[dict[str, Any]]:
+    """Planning à venir, trié par prochaine exécution."""
+    items = [{"query": q, **e} for q, e in state["queries"].items()]
+    paused_until = state.get("paused_until")
+    if paused_until:
+        for item in items:
+            item["next_run"] = max(item["next_run"], paused_until, key=_parse)
+    items.sort(key=lambda i: _parse(i["next_run"]))
+    return items
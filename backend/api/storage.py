@@ -3,9 +3,11 @@ Persistance des vidéos dans un fichier JSON.
 Écriture atomique pour éviter la corruption.
 """
 
+import fcntl
 import json
 import os
 import tempfile
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
@@ -13,6 +15,13 @@ from typing import Any
 DATA_PATH = Path(os.environ.get("DATA_PATH", "/app/data/videos.json"))
 CONFIG_PATH = DATA_PATH.parent / "config.json"
 QUOTA_PATH = DATA_PATH.parent / "quota_status.json"
+THUMBNAILS_DIR = DATA_PATH.parent / "thumbnails"
+CHANNELS_PATH = DATA_PATH.parent / "channels.json"
+SCHEDULE_PATH = DATA_PATH.parent / "schedule.json"
+PROFILES_DIR = DATA_PATH.parent / "profiles"
+RELATED_PATH = DATA_PATH.parent / "related.json"
+RAW_PATH = DATA_PATH.parent / "raw_videos.json"
+CATALOG_META_PATH = DATA_PATH.parent / "catalog_meta.json"
 
 DEFAULT_QUERIES = [
     "Kubernetes production français",
@@ -68,6 +77,89 @@ def save_config(config: dict) -> None:
     tmp.replace(CONFIG_PATH)
 
 
+def load_channel_stats() -> dict[str, Any]:
+    """Charge les statistiques de réputation par chaîne."""
+    if not CHANNELS_PATH.exists():
+        return {}
+    with CHANNELS_PATH.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_channel_stats(stats: dict[str, Any]) -> None:
+    """Sauvegarde atomique des statistiques par chaîne."""
+    _ensure_dir()
+    tmp = CHANNELS_PATH.with_suffix(".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(stats, f, ensure_ascii=False)
+    tmp.replace(CHANNELS_PATH)
+
+
+def load_schedule() -> dict[str, Any]:
+    """Charge l'état de planification des requêtes du worker."""
+    if not SCHEDULE_PATH.exists():
+        return {"queries": {}, "recent_runs": [], "paused_until": None}
+    with SCHEDULE_PATH.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_schedule(state: dict[str, Any]) -> None:
+    """Sauvegarde atomique de l'état de planification."""
+    _ensure_dir()
+    tmp = SCHEDULE_PATH.with_suffix(".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    tmp.replace(SCHEDULE_PATH)
+
+
+def load_related() -> dict[str, Any]:
+    """Charge l'index précalculé des vidéos similaires."""
+    if not RELATED_PATH.exists():
+        return {}
+    with RELATED_PATH.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_related(index: dict[str, Any]) -> None:
+    """Sauvegarde atomique de l'index des vidéos similaires."""
+    _ensure_dir()
+    tmp = RELATED_PATH.with_suffix(".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+    tmp.replace(RELATED_PATH)
+
+
+def _file_version(path: Path) -> tuple[int, int] | None:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+# Catalogue par ID et index des similaires, conservés entre deux requêtes
+_video_lookup: dict[str, Any] = {"version": None, "by_id": {}}
+_related_lookup: dict[str, Any] = {"version": None, "neighbours": {}}
+
+
+def load_video_lookup() -> dict[str, dict[str, Any]]:
+    """Vidéos par ID, gardées en mémoire et relues uniquement si videos.json a changé."""
+    version = (DATA_PATH, _file_version(DATA_PATH))
+    if _video_lookup["version"] != version:
+        _video_lookup.update(version=version, by_id={v["id"]: v for v in load_videos()})
+    return _video_lookup["by_id"]
+
+
+def load_related_lookup() -> tuple[dict[str, list], dict[str, dict[str, Any]]]:
+    """
+    Retourne (voisins par ID, vidéos par ID), gardés en mémoire et relus
+    uniquement si related.json ou videos.json a changé sur disque.
+    """
+    version = (RELATED_PATH, _file_version(RELATED_PATH))
+    if _related_lookup["version"] != version:
+        _related_lookup.update(version=version, neighbours=load_related().get("neighbours", {}))
+    return _related_lookup["neighbours"], load_video_lookup()
+
+
 def load_videos() -> list[dict[str, Any]]:
     """Charge la liste des vidéos depuis le fichier JSON."""
     if not DATA_PATH.exists():
@@ -85,6 +177,56 @@ def save_videos(videos: list[dict[str, Any]]) -> None:
     tmp.replace(DATA_PATH)
 
 
+def load_raw_videos() -> list[dict[str, Any]] | None:
+    """Charge les champs bruts récupérés sur YouTube (None si jamais enregistrés)."""
+    if not RAW_PATH.exists():
+        return None
+    with RAW_PATH.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_raw_videos(videos: list[dict[str, Any]]) -> None:
+    """Sauvegarde atomique des champs bruts des vidéos."""
+    _ensure_dir()
+    tmp = RAW_PATH.with_suffix(".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(videos, f, ensure_ascii=False, default=str)
+    tmp.replace(RAW_PATH)
+
+
+@contextmanager
+def catalog_lock():
+    """
+    Verrou exclusif inter-processus (API et worker) autour d'une lecture-fusion-écriture
+    de raw_videos.json / videos.json.
+    """
+    _ensure_dir()
+    # Dérivé de DATA_PATH à l'appel : toujours à côté du catalogue verrouillé
+    with DATA_PATH.with_name("catalog.lock").open("a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def load_catalog_meta() -> dict[str, Any]:
+    """Charge les métadonnées du catalogue (empreinte des règles de scoring)."""
+    if not CATALOG_META_PATH.exists():
+        return {}
+    with CATALOG_META_PATH.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_catalog_meta(meta: dict[str, Any]) -> None:
+    """Sauvegarde atomique des métadonnées du catalogue."""
+    _ensure_dir()
+    tmp = CATALOG_META_PATH.with_suffix(".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    tmp.replace(CATALOG_META_PATH)
+
+
 def get_last_updated() -> datetime | None:
     """Retourne la date de dernière modification du fichier de données."""
     if not DATA_PATH.exists():
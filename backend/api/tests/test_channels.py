@@ -0,0 +1,95 @@
+"""Tests de la réputation des chaînes."""
+
+import asyncio
+
+import httpx
+
+from api.channels import (
+    MIN_OBSERVATIONS, channel_verdict, prefilter, record_accepted, record_rejected, summarize,
+)
+from api.youtube_client import get_video_details
+
+
+def _video(video_id: str, channel_id: str = "UC1", score: float = 50.0) -> dict:
+    return {"id": video_id, "channel_id": channel_id, "channel": "DevOps France", "score": score}
+
+
+class TestChannelStats:
+    def test_unknown_channel_is_ok(self):
+        assert channel_verdict({}, "UC1") == "ok"
+
+    def test_accepted_counted_once_across_runs(self):
+        stats: dict = {}
+        record_accepted(stats, [_video("a", score=40), _video("b", score=60)])
+        record_accepted(stats, [_video("a", score=40)])
+        summary = summarize("UC1", stats["UC1"])
+        assert summary["accepted_count"] == 2
+        assert summary["mean_score"] == 50.0
+
+    def test_mostly_rejected_channel_is_skipped(self):
+        stats: dict = {}
+        for i in range(MIN_OBSERVATIONS):
+            record_rejected(stats, "UC1", "English Channel", f"v{i}")
+        assert channel_verdict(stats, "UC1") == "skip"
+
+    def test_low_score_channel_is_deprioritized(self):
+        stats: dict = {}
+        record_accepted(stats, [_video(f"v{i}", score=5.0) for i in range(MIN_OBSERVATIONS)])
+        assert channel_verdict(stats, "UC1") == "deprioritize"
+
+    def test_too_few_observations_is_ok(self):
+        stats: dict = {}
+        record_rejected(stats, "UC1", "English Channel", "v0")
+        assert channel_verdict(stats, "UC1") == "ok"
+
+
+class TestPrefilter:
+    def test_splits_candidates_by_verdict(self):
+        stats: dict = {}
+        for i in range(MIN_OBSERVATIONS):
+            record_rejected(stats, "UCbad", "", f"r{i}")
+        record_accepted(stats, [_video(f"l{i}", "UClow", 5.0) for i in range(MIN_OBSERVATIONS)])
+        candidates = [
+            {"id": "1", "channel_id": "UCbad"},
+            {"id": "2", "channel_id": "UClow"},
+            {"id": "3", "channel_id": "UCnew"},
+        ]
+        kept, deferred = prefilter(candidates, stats)
+        assert [c["id"] for c in kept] == ["3"]
+        assert [c["id"] for c in deferred] == ["2"]
+
+
+class TestVideoDetailsRejections:
+    def test_rejected_videos_recorded_per_channel(self):
+        items = [
+            {
+                "id": "en1",
+                "snippet": {
+                    "title": "Kubernetes in production", "channelId": "UCen",
+                    "channelTitle": "English Channel", "defaultAudioLanguage": "en",
+                    "publishedAt": "2024-01-01T00:00:00Z",
+                },
+                "statistics": {}, "contentDetails": {},
+            },
+            {
+                "id": "fr1",
+                "snippet": {
+                    "title": "Kubernetes en production", "channelId": "UCfr",
+                    "channelTitle": "DevOps France", "defaultAudioLanguage": "fr",
+                    "publishedAt": "2024-01-01T00:00:00Z",
+                },
+                "statistics": {}, "contentDetails": {},
+            },
+        ]
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, json={"items": items}))
+        stats: dict = {}
+
+        async def run():
+            async with httpx.AsyncClient(transport=transport) as client:
+                return await get_video_details(["en1", "fr1"], client, "key", stats)
+
+        videos = asyncio.run(run())
+        assert [v["id"] for v in videos] == ["fr1"]
+        assert videos[0]["channel_id"] == "UCfr"
+        assert stats["UCen"]["rejected"] == ["en1"]
+        assert "UCfr" not in stats
@@ -0,0 +1,107 @@
+"""Tests du profilage à la demande."""
+
+import time
+
+from api import profiling
+from api.profiling import SamplingProfiler, SlowRequestLog, profiling_allowed, save_profile
+
+
+def _busy_loop(duration: float) -> None:
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        pass
+
+
+class TestSamplingProfiler:
+    def test_collapsed_stacks_contain_hot_function(self):
+        with SamplingProfiler(interval=0.001) as prof:
+            _busy_loop(0.1)
+        collapsed = prof.collapsed()
+        assert "test_profiling._busy_loop" in collapsed
+        stack, count = collapsed.splitlines()[0].rsplit(" ", 1)
+        assert ";" in stack
+        assert int(count) > 0
+
+    def test_save_profile_keeps_latest_only(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(profiling, "PROFILES_DIR", tmp_path)
+        monkeypatch.setattr(profiling, "MAX_STORED_PROFILES", 2)
+        paths = [save_profile("/api/videos", f"a;b {i}\n") for i in range(4)]
+        assert sorted(tmp_path.iterdir()) == paths[-2:]
+
+
+class TestProfilingAllowed:
+    def test_disabled_by_default(self, monkeypatch):
+        monkeypatch.setattr(profiling, "PROFILING_ENABLED", False)
+        monkeypatch.setattr(profiling, "PROFILING_TOKEN", "")
+        assert not profiling_allowed(None)
+        assert not profiling_allowed("")
+
+    def test_admin_token(self, monkeypatch):
+        monkeypatch.setattr(profiling, "PROFILING_ENABLED", False)
+        monkeypatch.setattr(profiling, "PROFILING_TOKEN", "secret")
+        assert profiling_allowed("secret")
+        assert not profiling_allowed("wrong")
+
+
+class TestSlowRequestLog:
+    def test_keeps_slowest_requests(self):
+        log = SlowRequestLog(size=2)
+        for i, duration in enumerate([0.1, 0.5, 0.2, 0.9]):
+            log.record("GET", "/api/videos", {"page": str(i)}, duration, 200)
+        assert [e["params"]["page"] for e in log.items()] == ["3", "1"]
+
+    def test_old_entries_expire(self):
+        log = SlowRequestLog(size=2, window_s=0)
+        log.record("GET", "/api/videos", {}, 5.0, 200)
+        time.sleep(0.01)
+        log.record("GET", "/api/status", {}, 0.01, 200)
+        assert [e["path"] for e in log.items()] == ["/api/status"]
+
+
+class TestProfileParameter:
+    def test_profile_returned_when_allowed(self, tmp_path, monkeypatch):
+        from fastapi.testclient import TestClient
+        from api.main import app
+
+        monkeypatch.setattr(profiling, "PROFILES_DIR", tmp_path)
+        monkeypatch.setattr(profiling, "PROFILING_ENABLED", False)
+        monkeypatch.setattr(profiling, "PROFILING_TOKEN", "secret")
+        client = TestClient(app)
+
+        plain = client.get("/api/config", params={"profile": "1"})
+        assert plain.headers["content-type"].startswith("application/json")
+
+        resp = client.get("/api/config", params={"profile": "1"}, headers={"X-Profile-Token": "secret"})
+        assert resp.headers["content-type"].startswith("text/plain")
+        assert resp.headers["X-Profiled-Status"] == "200"
+        assert len(list(tmp_path.glob("*.collapsed"))) == 1
+
+    def test_profile_response_keeps_cors_headers(self, tmp_path, monkeypatch):
+        from fastapi.testclient import TestClient
+        from api.main import app
+
+        monkeypatch.setattr(profiling, "PROFILES_DIR", tmp_path)
+        monkeypatch.setattr(profiling, "PROFILING_ENABLED", True)
+        client = TestClient(app)
+
+        resp = client.get(
+            "/api/config", params={"profile": "1"}, headers={"Origin": "http://localhost:3000"}
+        )
+        assert resp.headers["content-type"].startswith("text/plain")
+        assert resp.headers["access-control-allow-origin"] == "*"
+        assert "X-Profile-Path" in resp.headers["access-control-expose-headers"]
+
+    def test_refresh_profile_requires_token(self, monkeypatch):
+        from fastapi.testclient import TestClient
+        from api import main
+
+        calls = []
+        monkeypatch.setattr(main, "_run_refresh", lambda profile=False: calls.append(profile))
+        monkeypatch.setattr(main, "save_quota_status", lambda exceeded: None)
+        monkeypatch.setattr(profiling, "PROFILING_ENABLED", False)
+        monkeypatch.setattr(profiling, "PROFILING_TOKEN", "secret")
+        client = TestClient(main.app)
+
+        client.post("/api/refresh", params={"profile": "1"})
+        client.post("/api/refresh", params={"profile": "1"}, headers={"X-Profile-Token": "secret"})
+        assert calls == [False, True]
@@ -0,0 +1,52 @@
+"""Tests de la route des vidéos similaires."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import storage
+from api.main import app
+
+
+def _video(video_id: str) -> dict:
+    return {
+        "id": video_id,
+        "title": f"Kubernetes {video_id}",
+        "channel": "DevOps France",
+        "published_at": "2026-01-01T00:00:00+00:00",
+        "duration_seconds": 600,
+        "view_count": 100,
+        "like_count": 5,
+        "thumbnail_url": "",
+        "youtube_url": f"https://www.youtube.com/watch?v={video_id}",
+        "score": 50.0,
+    }
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "DATA_PATH", tmp_path / "videos.json")
+    monkeypatch.setattr(storage, "RELATED_PATH", tmp_path / "related.json")
+    storage.save_videos([_video("a"), _video("b"), _video("c")])
+    storage.save_related({"neighbours": {"a": [["b", 0.8], ["c", 0.3]], "b": [["a", 0.8]]}})
+    return TestClient(app)
+
+
+class TestRelatedVideos:
+    def test_neighbours_in_order(self, client):
+        resp = client.get("/api/videos/a/related")
+        assert resp.status_code == 200
+        assert [(v["id"], v["similarity"]) for v in resp.json()] == [("b", 0.8), ("c", 0.3)]
+        assert client.get("/api/videos/zz/related").status_code == 404
+
+    def test_index_is_reloaded_when_files_change(self, client, monkeypatch):
+        loads = []
+        load_related = storage.load_related
+        monkeypatch.setattr(storage, "load_related", lambda: loads.append(1) or load_related())
+
+        assert len(client.get("/api/videos/a/related").json()) == 2
+        assert len(client.get("/api/videos/a/related", params={"limit": 1}).json()) == 1
+        assert len(loads) == 1
+
+        storage.save_related({"neighbours": {"a": [["c", 0.5]]}})
+        assert [v["id"] for v in client.get("/api/videos/a/related").json()] == ["c"]
+        assert len(loads) == 2
@@ -0,0 +1,110 @@
+"""Tests du rescoring hors ligne."""
+
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from api import rescoring, storage
+from api.rescoring import persist_catalog, rescore_catalog, rules_fingerprint, score_all, scores_stale
+
+
+def _raw_video(video_id: str, **kwargs) -> dict:
+    video = {
+        "id": video_id,
+        "title": "Kubernetes ArgoCD GitOps en production",
+        "channel": "DevOps France",
+        "published_at": (datetime.now(timezone.utc) - timedelta(days=3)).isoformat(),
+        "duration_seconds": 1800,
+        "view_count": 5000,
+        "like_count": 250,
+        "thumbnail_url": "",
+        "youtube_url": f"https://www.youtube.com/watch?v={video_id}",
+        "tags": ["argocd", "gitops"],
+        "has_chapters": True,
+    }
+    video.update(kwargs)
+    return video
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "DATA_PATH", tmp_path / "videos.json")
+    monkeypatch.setattr(storage, "RAW_PATH", tmp_path / "raw_videos.json")
+    monkeypatch.setattr(storage, "CATALOG_META_PATH", tmp_path / "catalog_meta.json")
+    return tmp_path
+
+
+class TestPersistCatalog:
+    def test_raw_and_derived_fields_are_split(self, data_dir):
+        persist_catalog([_raw_video("a"), _raw_video("b", view_count=10)])
+        raw = json.loads((data_dir / "raw_videos.json").read_text())
+        catalog = json.loads((data_dir / "videos.json").read_text())
+        assert all("score" not in v and "topics" not in v for v in raw)
+        assert [v["id"] for v in catalog] == ["a", "b"]
+        assert "ci_cd" in catalog[0]["topics"]
+        assert not scores_stale()
+
+    def test_parallel_scoring_matches_sequential(self, monkeypatch):
+        videos = [_raw_video(f"v{i}", view_count=i * 100) for i in range(20)]
+        monkeypatch.setattr(rescoring, "PARALLEL_MIN_VIDEOS", 1)
+        monkeypatch.setattr(rescoring, "CHUNK_SIZE", 3)
+        assert score_all(videos, workers=2) == score_all(videos, workers=1)
+
+
+class TestRescore:
+    def test_fingerprint_change_marks_catalog_stale(self, monkeypatch):
+        persist_catalog([_raw_video("a")])
+        monkeypatch.setattr(rescoring, "rules_fingerprint", lambda: "new-rules")
+        assert scores_stale()
+        rescore_catalog()
+        assert not scores_stale()
+
+    def test_rescore_waits_for_catalog_lock(self):
+        persist_catalog([_raw_video("a")])
+        done = threading.Event()
+        with storage.catalog_lock():
+            worker = threading.Thread(target=lambda: (rescore_catalog(), done.set()))
+            worker.start()
+            # Une fusion du worker en cours (verrou tenu) : le rescoring attend
+            assert not done.wait(0.2)
+            storage.save_raw_videos([_raw_video("a"), _raw_video("b")])
+        worker.join(5)
+        assert done.is_set()
+        assert {v["id"] for v in storage.load_videos()} == {"a", "b"}
+
+    def test_legacy_catalog_is_migrated(self, data_dir):
+        legacy = [{**_raw_video("a"), "score": 0.0, "topics": []}]
+        (data_dir / "videos.json").write_text(json.dumps(legacy))
+        scored = rescore_catalog()
+        assert scored[0]["score"] > 0
+        assert scored[0]["topics"]
+        assert storage.load_catalog_meta()["scoring_fingerprint"] == rules_fingerprint()
+        assert "score" not in storage.load_raw_videos()[0]
+
+    def test_rescore_endpoint(self):
+        from fastapi.testclient import TestClient
+        from api.main import app
+
+        persist_catalog([_raw_video("a")])
+        resp = TestClient(app).post("/api/rescore")
+        assert resp.status_code == 200
+        assert resp.json()["rescored"] == 1
+        assert resp.json()["scoring_fingerprint"] == rules_fingerprint()
+
+    def test_rescore_blocks_refresh(self, monkeypatch):
+        from fastapi.testclient import TestClient
+        from api import main
+
+        client = TestClient(main.app)
+        seen = []
+
+        def rescore_catalog():
+            seen.append(client.post("/api/refresh").status_code)
+            return []
+
+        monkeypatch.setattr(main, "rescore_catalog", rescore_catalog)
+        assert client.post("/api/rescore").status_code == 200
+        assert seen == [409]
+        assert not main._refresh_running
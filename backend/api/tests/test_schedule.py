@@ -0,0 +1,72 @@
+"""Tests de la planification adaptative."""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+from api import schedule
+from api.schedule import (
+    MAX_INTERVAL_HOURS, MIN_INTERVAL_HOURS, due_queries, next_interval,
+    pause_until_quota_reset, record_run, sync_queries, upcoming,
+)
+
+NOW = datetime(2024, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _state(queries: list[str]) -> dict:
+    state = {"queries": {}, "recent_runs": [], "paused_until": None}
+    sync_queries(state, queries, NOW, random.Random(0))
+    return state
+
+
+class TestNextInterval:
+    def test_high_yield_shortens_interval(self):
+        assert next_interval(24, 20) == 12
+
+    def test_zero_yield_lengthens_interval(self):
+        assert next_interval(24, 0) == 48
+
+    def test_interval_is_bounded(self):
+        assert next_interval(MIN_INTERVAL_HOURS, 100) == MIN_INTERVAL_HOURS
+        assert next_interval(MAX_INTERVAL_HOURS, 0) == MAX_INTERVAL_HOURS
+
+
+class TestSyncQueries:
+    def test_new_queries_are_staggered(self):
+        state = _state(["a", "b", "c"])
+        runs = sorted(datetime.fromisoformat(e["next_run"]) for e in state["queries"].values())
+        assert runs[1] - runs[0] >= timedelta(minutes=15)
+
+    def test_removed_queries_are_dropped(self):
+        state = _state(["a", "b"])
+        sync_queries(state, ["a"], NOW, random.Random(0))
+        assert list(state["queries"]) == ["a"]
+
+
+class TestDueQueries:
+    def test_global_rate_is_enforced(self, monkeypatch):
+        monkeypatch.setattr(schedule, "MAX_SEARCHES_PER_HOUR", 2)
+        state = _state([f"q{i}" for i in range(5)])
+        later = NOW + timedelta(days=1)
+        due = due_queries(state, later)
+        assert len(due) == 2
+        for q in due:
+            record_run(state, q, 3, later, random.Random(0))
+        assert due_queries(state, later) == []
+        assert len(due_queries(state, later + timedelta(hours=1, seconds=1))) == 2
+
+    def test_paused_state_runs_nothing(self):
+        state = _state(["a"])
+        pause_until_quota_reset(state, NOW)
+        assert due_queries(state, NOW + timedelta(hours=1)) == []
+        assert upcoming(state)[0]["next_run"] == state["paused_until"]
+
+
+class TestRecordRun:
+    def test_productive_query_runs_sooner(self):
+        state = _state(["hot", "cold"])
+        rng = random.Random(0)
+        for _ in range(5):
+            record_run(state, "hot", 20, NOW, rng)
+            record_run(state, "cold", 0, NOW, rng)
+        assert state["queries"]["hot"]["interval_hours"] < state["queries"]["cold"]["interval_hours"]
+        assert upcoming(state)[0]["query"] == "hot"
@@ -0,0 +1,153 @@
+"""Tests du proxy de miniatures (origine simulée via httpx.MockTransport)."""
+
+import asyncio
+import io
+import json
+import os
+
+import httpx
+import pytest
+from PIL import Image
+
+from api import thumbnails
+from api.thumbnails import get_thumbnail, prefetch_thumbnails, snap_width
+
+
+def _jpeg(width: int = 480, height: int = 360) -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 30, 30)).save(out, format="JPEG")
+    return out.getvalue()
+
+
+class FakeOrigin:
+    """CDN local : sert une image JPEG et compte les requêtes reçues."""
+
+    def __init__(self, status_code: int = 200):
+        self.status_code = status_code
+        self.calls = 0
+        self.image = _jpeg()
+
+    def client(self) -> httpx.AsyncClient:
+        def handler(request: httpx.Request) -> httpx.Response:
+            self.calls += 1
+            return httpx.Response(self.status_code, content=self.image)
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(thumbnails, "THUMBNAILS_DIR", tmp_path)
+    return tmp_path
+
+
+def _get(origin: FakeOrigin, video_id: str, width: int) -> bytes:
+    async def run():
+        async with origin.client() as client:
+            return await get_thumbnail(video_id, "https://i.ytimg.com/x.jpg", width, client)
+    return asyncio.run(run())
+
+
+class TestSnapWidth:
+    def test_snaps_up_to_next_variant(self):
+        assert snap_width(200) == 320
+
+    def test_caps_to_largest_variant(self):
+        assert snap_width(2000) == 480
+
+
+class TestGetThumbnail:
+    def test_returns_downscaled_webp(self):
+        data = _get(FakeOrigin(), "abc123", 160)
+        with Image.open(io.BytesIO(data)) as img:
+            assert img.format == "WEBP"
+            assert img.width == 160
+
+    def test_origin_fetched_once(self):
+        origin = FakeOrigin()
+        _get(origin, "abc123", 160)
+        _get(origin, "abc123", 320)
+        _get(origin, "abc123", 320)
+        assert origin.calls == 1
+
+    def test_origin_error_raises(self):
+        with pytest.raises(thumbnails.ThumbnailError):
+            _get(FakeOrigin(status_code=404), "abc123", 320)
+
+    def test_cache_is_size_bounded(self, cache_dir, monkeypatch):
+        monkeypatch.setattr(thumbnails, "MAX_CACHE_BYTES", len(FakeOrigin().image) * 3)
+        origin = FakeOrigin()
+        for i in range(10):
+            _get(origin, f"vid{i}", 480)
+        total = sum(p.stat().st_size for p in cache_dir.iterdir())
+        assert total <= thumbnails.MAX_CACHE_BYTES
+        # La vidéo la plus récente est toujours en cache
+        assert (cache_dir / "vid9_480.webp").exists()
+
+    def test_no_eviction_scan_below_limit(self, monkeypatch):
+        evictions = []
+        monkeypatch.setattr(thumbnails, "evict_cache", lambda: evictions.append(1))
+        origin = FakeOrigin()
+        for i in range(5):
+            _get(origin, f"vid{i}", 160)
+        assert evictions == []
+
+
+class TestPrefetch:
+    def test_prefetches_top_videos_only(self, cache_dir):
+        origin = FakeOrigin()
+        videos = [{"id": f"vid{i}", "thumbnail_url": "https://i.ytimg.com/x.jpg"} for i in range(5)]
+
+        async def run():
+            async with origin.client() as client:
+                return await prefetch_thumbnails(videos, limit=2, client=client)
+
+        assert asyncio.run(run()) == 2
+        assert origin.calls == 2
+        for w in thumbnails.THUMBNAIL_WIDTHS:
+            assert (cache_dir / f"vid0_{w}.webp").exists()
+        assert not (cache_dir / "vid2.src").exists()
+
+    def test_batch_evicts_files_written_elsewhere(self, cache_dir, monkeypatch):
+        origin = FakeOrigin()
+        monkeypatch.setattr(thumbnails, "MAX_CACHE_BYTES", len(origin.image) * 4)
+        asyncio.run(prefetch_thumbnails([], limit=1))  # cache vide mesuré par ce processus
+        # Écrit ensuite par un autre processus (worker) : absent du compteur de ce processus
+        stale = cache_dir / "old_480.webp"
+        stale.write_bytes(b"\0" * len(origin.image) * 4)
+        os.utime(stale, (0, 0))
+        videos = [{"id": "vid0", "thumbnail_url": "https://i.ytimg.com/x.jpg"}]
+
+        async def run():
+            async with origin.client() as client:
+                return await prefetch_thumbnails(videos, limit=1, client=client)
+
+        assert asyncio.run(run()) == 1
+        assert not stale.exists()
+        assert (cache_dir / "vid0_320.webp").exists()
+
+
+class TestThumbnailEndpoint:
+    def test_misses_do_not_reload_catalogue(self, tmp_path, monkeypatch):
+        from fastapi.testclient import TestClient
+        from api import main, storage
+
+        monkeypatch.setattr(storage, "DATA_PATH", tmp_path / "videos.json")
+        (tmp_path / "videos.json").write_text(json.dumps(
+            [{"id": f"vid{i}", "thumbnail_url": f"https://i.ytimg.com/{i}.jpg"} for i in range(3)]
+        ))
+        loads = []
+        load_videos = storage.load_videos
+        monkeypatch.setattr(storage, "load_videos", lambda: loads.append(1) or load_videos())
+        urls = []
+
+        async def fake_get_thumbnail(video_id, url, width, client=None):
+            urls.append(url)
+            return b"webp"
+
+        monkeypatch.setattr(main, "get_thumbnail", fake_get_thumbnail)
+        client = TestClient(main.app)
+        for i in range(3):
+            assert client.get(f"/api/thumbnails/vid{i}").content == b"webp"
+        assert client.get("/api/thumbnails/unknown").status_code == 404
+        assert urls == [f"https://i.ytimg.com/{i}.jpg" for i in range(3)]
+        assert len(loads) == 1
@@ -0,0 +1,217 @@
+"""
+Proxy local des miniatures YouTube.
+Chaque miniature est téléchargée une seule fois puis servie en variantes WebP
+redimensionnées depuis un cache disque borné en taille (éviction LRU).
+"""
+
+import asyncio
+import io
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any
+
+import httpx
+from PIL import Image
+
+from .storage import THUMBNAILS_DIR
+
+logger = logging.getLogger(__name__)
+
+# Largeurs servies (px) — une card du dashboard n'a pas besoin de plus
+THUMBNAIL_WIDTHS = (160, 320, 480)
+DEFAULT_WIDTH = 320
+WEBP_QUALITY = 80
+
+MAX_CACHE_BYTES = int(os.environ.get("THUMBNAIL_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+PREFETCH_COUNT = int(os.environ.get("THUMBNAIL_PREFETCH_COUNT", 100))
+
+_VIDEO_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# Taille du cache par répertoire : mesurée au premier accès, tenue à jour à chaque
+# écriture et resynchronisée par chaque éviction (le worker écrit aussi dans le cache)
+_cache_bytes: dict[Path, int] = {}
+_cache_lock = threading.Lock()
+
+
+class ThumbnailError(Exception):
+    """Levée quand une miniature ne peut pas être récupérée ou décodée."""
+
+
+def is_valid_video_id(video_id: str) -> bool:
+    """Vérifie qu'un ID vidéo est sûr à utiliser comme nom de fichier."""
+    return bool(_VIDEO_ID_RE.match(video_id))
+
+
+def snap_width(width: int) -> int:
+    """Ramène une largeur demandée à la plus petite variante suffisante."""
+    for w in THUMBNAIL_WIDTHS:
+        if width <= w:
+            return w
+    return THUMBNAIL_WIDTHS[-1]
+
+
+def _source_path(video_id: str) -> Path:
+    return THUMBNAILS_DIR / f"{video_id}.src"
+
+
+def _variant_path(video_id: str, width: int) -> Path:
+    return THUMBNAILS_DIR / f"{video_id}_{width}.webp"
+
+
+def _read_cached(path: Path) -> bytes | None:
+    """Lit un fichier du cache et rafraîchit son mtime (ordre LRU)."""
+    try:
+        data = path.read_bytes()
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return data
+
+
+def _cache_entries() -> list[tuple[float, int, Path]]:
+    entries = []
+    for p in THUMBNAILS_DIR.iterdir():
+        if p.suffix == ".tmp":
+            continue
+        try:
+            st = p.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((st.st_mtime, st.st_size, p))
+    return entries
+
+
+def _write_cached(path: Path, data: bytes) -> None:
+    """Écriture atomique dans le cache ; éviction seulement si la taille max est dépassée."""
+    THUMBNAILS_DIR.mkdir(parents=True, exist_ok=True)
+    with _cache_lock:
+        if THUMBNAILS_DIR not in _cache_bytes:
+            _cache_bytes[THUMBNAILS_DIR] = sum(size for _, size, _ in _cache_entries())
+        try:
+            replaced = path.stat().st_size
+        except FileNotFoundError:
+            replaced = 0
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_bytes(data)
+        tmp.replace(path)
+        _cache_bytes[THUMBNAILS_DIR] += len(data) - replaced
+        over = _cache_bytes[THUMBNAILS_DIR] > MAX_CACHE_BYTES
+    if over:
+        evict_cache()
+
+
+def evict_cache() -> None:
+    """Supprime les fichiers les moins récemment utilisés au-delà de MAX_CACHE_BYTES."""
+    with _cache_lock:
+        if not THUMBNAILS_DIR.exists():
+            return
+        entries = _cache_entries()
+        total = sum(size for _, size, _ in entries)
+        entries.sort(key=lambda e: e[0])
+        for _, size, p in entries:
+            if total <= MAX_CACHE_BYTES:
+                break
+            p.unlink(missing_ok=True)
+            total -= size
+        _cache_bytes[THUMBNAILS_DIR] = total
+
+
+def _make_variant(source: bytes, width: int) -> bytes:
+    """Redimensionne une image source en WebP à la largeur donnée (ratio conservé)."""
+    try:
+        with Image.open(io.BytesIO(source)) as img:
+            img = img.convert("RGB")
+            if img.width > width:
+                height = round(img.height * width / img.width)
+                img = img.resize((width, height), Image.Resampling.LANCZOS)
+            out = io.BytesIO()
+            img.save(out, format="WEBP", quality=WEBP_QUALITY)
+    except Exception as exc:
+        raise ThumbnailError(f"Image illisible : {exc}") from exc
+    return out.getvalue()
+
+
+async def _fetch_source(video_id: str, url: str, client: httpx.AsyncClient) -> bytes:
+    """Retourne l'image d'origine, téléchargée depuis le CDN au premier accès seulement."""
+    path = _source_path(video_id)
+    cached = await asyncio.to_thread(_read_cached, path)
+    if cached is not None:
+        return cached
+    if not url:
+        raise ThumbnailError(f"Pas de miniature pour la vidéo {video_id}")
+
+    try:
+        resp = await client.get(url, timeout=15.0)
+        resp.raise_for_status()
+    except httpx.HTTPError as exc:
+        raise ThumbnailError(f"Téléchargement impossible pour {video_id} : {exc}") from exc
+
+    await asyncio.to_thread(_write_cached, path, resp.content)
+    return resp.content
+
+
+async def get_thumbnail(
+    video_id: str,
+    url: str,
+    width: int = DEFAULT_WIDTH,
+    client: httpx.AsyncClient | None = None,
+) -> bytes:
+    """Retourne la variante WebP d'une miniature, en la générant si besoin."""
+    width = snap_width(width)
+    path = _variant_path(video_id, width)
+    cached = await asyncio.to_thread(_read_cached, path)
+    if cached is not None:
+        return cached
+
+    if client is None:
+        async with httpx.AsyncClient() as own_client:
+            source = await _fetch_source(video_id, url, own_client)
+    else:
+        source = await _fetch_source(video_id, url, client)
+
+    data = await asyncio.to_thread(_make_variant, source, width)
+    await asyncio.to_thread(_write_cached, path, data)
+    return data
+
+
+def get_cached_thumbnail(video_id: str, width: int = DEFAULT_WIDTH) -> bytes | None:
+    """Retourne la variante si elle est déjà en cache, sans accès réseau."""
+    return _read_cached(_variant_path(video_id, snap_width(width)))
+
+
+async def prefetch_thumbnails(
+    videos: list[dict[str, Any]],
+    limit: int = PREFETCH_COUNT,
+    client: httpx.AsyncClient | None = None,
+) -> int:
+    """
+    Précharge toutes les variantes des `limit` premières vidéos (supposées triées par score).
+    Retourne le nombre de vidéos dont les miniatures sont disponibles en cache.
+    Le cache est ramené sous sa taille max une fois le lot terminé.
+    """
+    if limit <= 0:
+        return 0
+
+    async def _run(c: httpx.AsyncClient) -> int:
+        done = 0
+        for v in videos[:limit]:
+            if not is_valid_video_id(v.get("id", "")):
+                continue
+            try:
+                for w in THUMBNAIL_WIDTHS:
+                    await get_thumbnail(v["id"], v.get("thumbnail_url", ""), w, c)
+                done += 1
+            except ThumbnailError as exc:
+                logger.warning("Miniature ignorée : %s", exc)
+        return done
+
+    if client is None:
+        async with httpx.AsyncClient() as own_client:
+            done = await _run(own_client)
+    else:
+        done = await _run(client)
+    await asyncio.to_thread(evict_cache)
+    return done
@@ -11,14 +11,27 @@ from typing import Any
 
 import httpx
 
+from .channels import prefilter, record_rejected
+
 logger = logging.getLogger(__name__)
 
 
 class QuotaExceededError(Exception):
-    """Levée quand le quota journalier YouTube API est dépassé (HTTP 403)."""
+    """
+    Levée quand le quota journalier YouTube API est dépassé (HTTP 403).
+    `videos` : vidéos déjà détaillées avant le dépassement (renseigné par fetch_all_videos).
+    """
+
+    def __init__(self, message: str, videos: list[dict[str, Any]] | None = None):
+        super().__init__(message)
+        self.videos = videos if videos is not None else []
 
 YOUTUBE_API_BASE = "https://www.googleapis.com/youtube/v3"
 
+# Transport HTTP utilisé par fetch_all_videos (None = réseau réel).
+# Remplacé par un stand-in local pour le replay et les benchmarks (voir bench/).
+_transport: httpx.AsyncBaseTransport | None = None
+
 SEARCH_QUERIES = [
     "Kubernetes production français",
     "Kubernetes architecture français",
@@ -31,6 +44,12 @@ SEARCH_QUERIES = [
 ]
 
 
+def set_transport(transport: httpx.AsyncBaseTransport | None) -> None:
+    """Remplace le transport HTTP des appels YouTube (None pour revenir au réseau)."""
+    global _transport
+    _transport = transport
+
+
 def _get_api_key() -> str:
     key = os.environ.get("YOUTUBE_API_KEY", "")
     if not key:
@@ -60,10 +79,13 @@ def _has_chapters(description: str) -> bool:
     return bool(re.search(r"^\s*\d+:\d+", description or "", re.MULTILINE))
 
 
-async def search_videos(query: str, client: httpx.AsyncClient, api_key: str) -> list[str]:
-    """Retourne une liste d'IDs vidéos pour une requête donnée."""
+async def search_videos(query: str, client: httpx.AsyncClient, api_key: str) -> list[dict[str, str]]:
+    """
+    Retourne les candidats pour une requête donnée : {"id", "channel_id", "channel"}.
+    Le snippet (même coût en quota que `id`) fournit la chaîne avant l'appel `videos`.
+    """
     params = {
-        "part": "id",
+        "part": "snippet",
         "q": query,
         "type": "video",
         "relevanceLanguage": "fr",
@@ -80,11 +102,26 @@ async def search_videos(query: str, client: httpx.AsyncClient, api_key: str) ->
             raise QuotaExceededError("Quota YouTube API journalier dépassé (HTTP 403)") from e
         raise
     data = resp.json()
-    return [item["id"]["videoId"] for item in data.get("items", [])]
-
-
-async def get_video_details(video_ids: list[str], client: httpx.AsyncClient, api_key: str) -> list[dict[str, Any]]:
-    """Retourne les détails enrichis pour une liste d'IDs vidéos."""
+    return [
+        {
+            "id": item["id"]["videoId"],
+            "channel_id": item.get("snippet", {}).get("channelId", ""),
+            "channel": item.get("snippet", {}).get("channelTitle", ""),
+        }
+        for item in data.get("items", [])
+    ]
+
+
+async def get_video_details(
+    video_ids: list[str],
+    client: httpx.AsyncClient,
+    api_key: str,
+    channel_stats: dict[str, Any] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Retourne les détails enrichis pour une liste d'IDs vidéos.
+    Si channel_stats est fourni, les vidéos écartées y sont comptabilisées par chaîne.
+    """
     if not video_ids:
         return []
 
@@ -118,12 +155,20 @@ async def get_video_details(video_ids: list[str], client: httpx.AsyncClient, api
         if (audio_lang and not audio_lang.startswith("fr")
                 and not default_lang.startswith("fr")):
             if not re.search(r"[éèêëàâùûîïôçœæ]", title, re.IGNORECASE):
+                if channel_stats is not None:
+                    record_rejected(
+                        channel_stats,
+                        snippet.get("channelId", ""),
+                        snippet.get("channelTitle", ""),
+                        item["id"],
+                    )
                 continue
 
         videos.append({
             "id": item["id"],
             "title": title,
             "channel": snippet.get("channelTitle", ""),
+            "channel_id": snippet.get("channelId", ""),
             "published_at": snippet.get("publishedAt", ""),
             "duration_seconds": duration_s,
             "view_count": int(stats.get("viewCount", 0)),
@@ -137,27 +182,60 @@ async def get_video_details(video_ids: list[str], client: httpx.AsyncClient, api
     return videos
 
 
-async def fetch_all_videos(queries: list[str] | None = None) -> list[dict[str, Any]]:
-    """Lance la recherche sur tous les mots-clés et déduplique par ID."""
+async def fetch_all_videos(
+    queries: list[str] | None = None,
+    channel_stats: dict[str, Any] | None = None,
+    query_ids: dict[str, list[str]] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Lance la recherche sur tous les mots-clés et déduplique par ID.
+    Si channel_stats est fourni, les chaînes à mauvaise réputation sont écartées
+    (ou différées en fin de run) avant l'appel `videos`.
+    Si query_ids est fourni, il reçoit les IDs trouvés (non déjà vus) par requête aboutie.
+    En cas de dépassement de quota, les vidéos déjà récupérées sont dans l'exception.
+    """
     if queries is None:
         queries = SEARCH_QUERIES
     api_key = _get_api_key()
     seen_ids: set[str] = set()
     all_videos: list[dict[str, Any]] = []
+    deferred_ids: list[str] = []
+    if query_ids is None:
+        query_ids = {}
 
-    async with httpx.AsyncClient() as client:
+    async with httpx.AsyncClient(transport=_transport) as client:
         for query in queries:
             try:
-                ids = await search_videos(query, client, api_key)
-                new_ids = [vid_id for vid_id in ids if vid_id not in seen_ids]
-                seen_ids.update(new_ids)
-                details = await get_video_details(new_ids, client, api_key)
+                candidates = await search_videos(query, client, api_key)
+                candidates = [c for c in candidates if c["id"] not in seen_ids]
+                seen_ids.update(c["id"] for c in candidates)
+                query_ids[query] = [c["id"] for c in candidates]
+                if channel_stats is not None:
+                    kept, deferred = prefilter(candidates, channel_stats)
+                    skipped = len(candidates) - len(kept) - len(deferred)
+                    if skipped:
+                        logger.info("Requête '%s' : %d vidéos de chaînes ignorées", query, skipped)
+                    deferred_ids.extend(c["id"] for c in deferred)
+                    candidates = kept
+                new_ids = [c["id"] for c in candidates]
+                details = await get_video_details(new_ids, client, api_key, channel_stats)
                 all_videos.extend(details)
                 logger.info("Requête '%s' → %d vidéos", query, len(details))
-            except QuotaExceededError:
+            except QuotaExceededError as exc:
                 logger.warning("Quota YouTube dépassé — arrêt des requêtes restantes")
-                raise
+                query_ids.pop(query, None)
+                raise QuotaExceededError(str(exc), videos=all_videos) from exc
             except Exception as exc:
+                # Requête en erreur : absente de query_ids (pas un run sans résultat)
+                query_ids.pop(query, None)
                 logger.error("Erreur pour la requête '%s': %s", query, exc)
 
+        if deferred_ids:
+            try:
+                details = await get_video_details(deferred_ids, client, api_key, channel_stats)
+                all_videos.extend(details)
+                logger.info("Chaînes différées → %d vidéos", len(details))
+            except Exception as exc:
+                logger.error("Erreur pour les chaînes différées : %s", exc)
+
     return all_videos
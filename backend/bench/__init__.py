@@ -0,0 +1 @@
+# Outils de benchmark et de replay
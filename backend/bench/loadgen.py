@@ -0,0 +1,193 @@
+"""
+Générateur de charge du pipeline de mise à jour, hors ligne.
+
+Pilote `worker.scheduler.run_pipeline` et `api.main._run_refresh` contre le
+stand-in YouTube de bench/replay.py, dans un répertoire de données temporaire,
+et rapporte le débit et le temps passé par étape.
+
+    python -m bench.loadgen --queries 4000 --pool 300000 --latency 0.005
+    python -m bench.loadgen --record data/yt.jsonl --queries 8   # enregistre l'API réelle
+    python -m bench.loadgen --replay data/yt.jsonl               # rejoue l'enregistrement
+"""
+
+import argparse
+import functools
+import inspect
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable
+
+
+class StageTimer:
+    """Cumule durée et nombre d'appels par étape."""
+
+    def __init__(self) -> None:
+        self.totals: dict[str, float] = defaultdict(float)
+        self.calls: dict[str, int] = defaultdict(int)
+
+    def wrap(self, name: str, func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    self.totals[name] += time.perf_counter() - start
+                    self.calls[name] += 1
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.totals[name] += time.perf_counter() - start
+                self.calls[name] += 1
+        return wrapper
+
+    def instrument(self, module: Any, names: list[str]) -> None:
+        """Remplace les attributs `names` de `module` par leur version chronométrée."""
+        for name in names:
+            setattr(module, name, self.wrap(name, getattr(module, name)))
+
+    def reset(self) -> None:
+        self.totals.clear()
+        self.calls.clear()
+
+    def report(self) -> dict[str, dict[str, float]]:
+        return {
+            name: {"calls": self.calls[name], "seconds": round(total, 4)}
+            for name, total in sorted(self.totals.items(), key=lambda i: -i[1])
+        }
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load generator du pipeline YTVeille")
+    parser.add_argument("--queries", type=int, default=1000,
+                        help="nombre de requêtes (synthétiques, ou max. rejouées)")
+    parser.add_argument("--pool", type=int, default=100_000, help="nombre d'IDs vidéos distincts")
+    parser.add_argument("--channels", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.0, help="latence par appel (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--quota-error-rate", type=float, default=0.0)
+    parser.add_argument("--quota-after", type=int, default=None, help="403 après N recherches")
+    parser.add_argument("--target", choices=["pipeline", "refresh", "both"], default="both")
+    parser.add_argument("--data-dir", default=None, help="répertoire de données (défaut : temporaire)")
+    parser.add_argument("--record", default=None, help="enregistre les réponses de l'API réelle (JSONL)")
+    parser.add_argument("--replay", default=None, help="rejoue un enregistrement JSONL")
+    parser.add_argument("--profile", action="store_true", help="profil collapsed de run_pipeline")
+    parser.add_argument("--json", action="store_true", help="rapport au format JSON")
+    parser.add_argument("--verbose", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> dict[str, Any]:
+    args = _parse_args(argv)
+
+    # Le stockage lit DATA_PATH à l'import : l'environnement doit être prêt avant
+    data_dir = Path(args.data_dir or tempfile.mkdtemp(prefix="ytveille-bench-"))
+    os.environ["DATA_PATH"] = str(data_dir / "videos.json")
+    os.environ.setdefault("THUMBNAIL_PREFETCH_COUNT", "0")
+    if not args.record:
+        os.environ.setdefault("YOUTUBE_API_KEY", "bench")
+
+    from api import main as api_main
+    from api import rescoring, storage, youtube_client
+    from worker import scheduler
+    from .replay import FakeYouTube, RecordingTransport, load_recordings, recorded_queries
+
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+
+    fake = None
+    recordings = load_recordings(args.replay) if args.replay else None
+    if args.record:
+        youtube_client.set_transport(RecordingTransport(args.record))
+        queries = storage.DEFAULT_QUERIES[: args.queries]
+    else:
+        fake = FakeYouTube(
+            pool_size=args.pool,
+            channels=args.channels,
+            latency=args.latency,
+            error_rate=args.error_rate,
+            quota_error_rate=args.quota_error_rate,
+            quota_after=args.quota_after,
+            recordings=recordings,
+        )
+        youtube_client.set_transport(fake.transport())
+        if recordings is not None:
+            # Rejouer les requêtes enregistrées : des requêtes synthétiques n'auraient aucune réponse
+            queries = recorded_queries(recordings)[: args.queries]
+        else:
+            queries = [f"Kubernetes requête synthétique {i}" for i in range(args.queries)]
+    storage.save_config({"queries": queries})
+
+    timer = StageTimer()
+    timer.instrument(youtube_client, ["search_videos", "get_video_details"])
+    timer.instrument(rescoring, ["score_all", "save_raw_videos", "save_videos"])
+    pipeline_stages = [
+        "fetch_all_videos", "persist_catalog",
+        "load_channel_stats", "record_accepted", "save_channel_stats", "prefetch_thumbnails",
+        "compute_related", "save_related",
+    ]
+    timer.instrument(scheduler, pipeline_stages)
+    timer.instrument(api_main, pipeline_stages)
+
+    targets: list[tuple[str, Callable[[], Any]]] = []
+    if args.target in ("pipeline", "both"):
+        targets.append(("run_pipeline", lambda: scheduler.run_pipeline(profile=args.profile)))
+    if args.target in ("refresh", "both"):
+        targets.append(("_run_refresh", api_main._run_refresh))
+
+    results: dict[str, Any] = {"data_dir": str(data_dir), "queries": len(queries), "runs": {}}
+    for name, func in targets:
+        timer.reset()
+        if fake is not None:
+            fake.stats = dict.fromkeys(fake.stats, 0)
+        start = time.perf_counter()
+        error = None
+        try:
+            func()
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+        elapsed = time.perf_counter() - start
+        stored = len(storage.load_videos())
+        results["runs"][name] = {
+            "seconds": round(elapsed, 3),
+            "stored": stored,
+            "queries_per_s": round(len(queries) / elapsed, 1) if elapsed else None,
+            "videos_per_s": round(stored / elapsed, 1) if elapsed else None,
+            "error": error,
+            "stages": timer.report(),
+            "fake_api": dict(fake.stats) if fake else None,
+        }
+
+    youtube_client.set_transport(None)
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+    else:
+        _print_report(results)
+    return results
+
+
+def _print_report(results: dict[str, Any]) -> None:
+    print(f"Données : {results['data_dir']} — {results['queries']} requêtes")
+    for name, run in results["runs"].items():
+        print(f"\n== {name} : {run['seconds']:.2f}s, {run['stored']} vidéos stockées "
+              f"({run['queries_per_s']} requêtes/s, {run['videos_per_s']} vidéos/s)")
+        if run["error"]:
+            print(f"   erreur : {run['error']}")
+        if run["fake_api"]:
+            print("   API simulée : " + ", ".join(f"{k}={v}" for k, v in run["fake_api"].items()))
+        for stage, t in run["stages"].items():
+            print(f"   {stage:<22} {t['seconds']:>9.3f}s  {t['calls']:>8} appels")
+
+
+if __name__ == "__main__":
+    main()
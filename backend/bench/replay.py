@@ -0,0 +1,227 @@
+"""
+Stand-in local de l'API YouTube Data v3 (endpoints `search` et `videos`).
+
+Sert des réponses enregistrées (record/replay) ou, à défaut, des réponses
+synthétiques déterministes, avec latence, taux d'erreur et 403 de quota
+configurables. S'utilise comme transport httpx :
+
+    fake = FakeYouTube(pool_size=100_000, latency=0.02, quota_after=500)
+    youtube_client.set_transport(fake.transport())
+"""
+
+import asyncio
+import json
+import random
+import zlib
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+# Paramètres exclus de la clé d'enregistrement (secrets ou dépendants de l'heure)
+_VOLATILE_PARAMS = {"key", "publishedAfter"}
+
+_TITLE_WORDS = [
+    "Kubernetes", "production", "retour d'expérience", "architecture", "incident",
+    "post-mortem", "ArgoCD", "GitOps", "Prometheus", "Grafana", "HPA", "KEDA",
+    "Istio", "service mesh", "RBAC", "Velero", "migration", "tutoriel", "débutant",
+    "observabilité", "scaling", "Helm", "sécurité", "stockage",
+]
+_TAGS = [
+    "kubernetes", "k8s", "devops", "cloud", "argocd", "helm", "prometheus",
+    "istio", "rbac", "keda", "gitops", "opentelemetry", "velero", "csi",
+]
+
+
+def _record_key(path: str, params: dict[str, str]) -> str:
+    kept = {k: v for k, v in params.items() if k not in _VOLATILE_PARAMS}
+    return f"{path}?{json.dumps(kept, sort_keys=True, ensure_ascii=False)}"
+
+
+def _api_path(url: httpx.URL) -> str:
+    """/youtube/v3/search → /search"""
+    return "/" + url.path.rstrip("/").rsplit("/", 1)[-1]
+
+
+def load_recordings(path: str | Path) -> dict[str, dict[str, Any]]:
+    """Charge un fichier JSONL produit par RecordingTransport."""
+    recordings: dict[str, dict[str, Any]] = {}
+    with Path(path).open("r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                rec = json.loads(line)
+                recordings[_record_key(rec["path"], rec["params"])] = rec
+    return recordings
+
+
+def recorded_queries(recordings: dict[str, dict[str, Any]]) -> list[str]:
+    """Requêtes de recherche présentes dans un enregistrement, dans l'ordre d'enregistrement."""
+    queries: dict[str, None] = {}
+    for rec in recordings.values():
+        if rec["path"] == "/search" and rec["params"].get("q"):
+            queries.setdefault(rec["params"]["q"], None)
+    return list(queries)
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Transport qui relaie vers le réseau et enregistre chaque réponse en JSONL."""
+
+    def __init__(self, path: str | Path, inner: httpx.AsyncBaseTransport | None = None):
+        self.path = Path(path)
+        self.inner = inner or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self.inner.handle_async_request(request)
+        content = await response.aread()
+        params = {k: v for k, v in request.url.params.items() if k != "key"}
+        try:
+            body = json.loads(content)
+        except ValueError:
+            body = None
+        if body is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as f:
+                rec = {
+                    "path": _api_path(request.url),
+                    "params": params,
+                    "status": response.status_code,
+                    "body": body,
+                }
+                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        return httpx.Response(
+            response.status_code,
+            headers=[(k, v) for k, v in response.headers.items()
+                     if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")],
+            content=content,
+        )
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class FakeYouTube:
+    """
+    API YouTube simulée.
+
+    pool_size        : nombre d'IDs vidéos distincts pouvant être renvoyés par `search`
+    channels         : nombre de chaînes synthétiques
+    non_french_ratio : part des chaînes dont les vidéos sont en anglais (rejetées par le filtre)
+    latency          : latence (s) ajoutée à chaque appel
+    error_rate       : probabilité d'un HTTP 500
+    quota_error_rate : probabilité d'un HTTP 403 de quota sur `search`
+    quota_after      : nombre d'appels `search` avant 403 systématique (None = illimité)
+    recordings       : réponses enregistrées servies en priorité
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 100_000,
+        channels: int = 500,
+        non_french_ratio: float = 0.1,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        quota_error_rate: float = 0.0,
+        quota_after: int | None = None,
+        recordings: dict[str, dict[str, Any]] | None = None,
+        seed: int = 0,
+    ):
+        self.pool_size = pool_size
+        self.channels = channels
+        self.non_french_ratio = non_french_ratio
+        self.latency = latency
+        self.error_rate = error_rate
+        self.quota_error_rate = quota_error_rate
+        self.quota_after = quota_after
+        self.recordings = recordings or {}
+        self._rng = random.Random(seed)
+        self._now = datetime.now(timezone.utc)
+        self.stats = {"search": 0, "videos": 0, "replayed": 0, "errors": 0, "quota_errors": 0}
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self._handle)
+
+    async def _handle(self, request: httpx.Request) -> httpx.Response:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        path = _api_path(request.url)
+        params = dict(request.url.params.items())
+        if path == "/search":
+            self.stats["search"] += 1
+            over_quota = self.quota_after is not None and self.stats["search"] > self.quota_after
+            if over_quota or self._rng.random() < self.quota_error_rate:
+                self.stats["quota_errors"] += 1
+                return httpx.Response(403, json={"error": {"code": 403, "message": "quotaExceeded"}})
+        elif path == "/videos":
+            self.stats["videos"] += 1
+        else:
+            return httpx.Response(404, json={"error": {"code": 404}})
+
+        if self._rng.random() < self.error_rate:
+            self.stats["errors"] += 1
+            return httpx.Response(500, json={"error": {"code": 500}})
+
+        rec = self.recordings.get(_record_key(path, params))
+        if rec is not None:
+            self.stats["replayed"] += 1
+            return httpx.Response(rec["status"], json=rec["body"])
+
+        if path == "/search":
+            return httpx.Response(200, json=self._search(params))
+        return httpx.Response(200, json=self._videos(params))
+
+    # --- Réponses synthétiques -------------------------------------------------
+
+    @staticmethod
+    def video_id(n: int) -> str:
+        return f"v{n:010d}"
+
+    def _channel_of(self, n: int) -> int:
+        return n % self.channels
+
+    def _search(self, params: dict[str, str]) -> dict[str, Any]:
+        rng = random.Random(zlib.crc32(params.get("q", "").encode()))
+        count = int(params.get("maxResults", 25))
+        items = []
+        for n in rng.sample(range(self.pool_size), min(count, self.pool_size)):
+            ch = self._channel_of(n)
+            items.append({
+                "id": {"kind": "youtube#video", "videoId": self.video_id(n)},
+                "snippet": {"channelId": f"UC{ch:022d}", "channelTitle": f"Chaîne {ch}"},
+            })
+        return {"items": items}
+
+    def _videos(self, params: dict[str, str]) -> dict[str, Any]:
+        items = []
+        for vid in params.get("id", "").split(","):
+            if not vid.startswith("v"):
+                continue
+            n = int(vid[1:])
+            rng = random.Random(n)
+            ch = self._channel_of(n)
+            english = ch < self.channels * self.non_french_ratio
+            words = [w for w in _TITLE_WORDS if w.isascii()] if english else _TITLE_WORDS
+            title = " ".join(rng.sample(words, 4))
+            views = int(rng.paretovariate(1.2) * 200)
+            published = self._now - timedelta(days=rng.uniform(0, 29), hours=rng.uniform(0, 23))
+            chapters = "0:00 Intro\n3:12 Démo\n" if rng.random() < 0.4 else ""
+            items.append({
+                "id": vid,
+                "snippet": {
+                    "title": title,
+                    "channelId": f"UC{ch:022d}",
+                    "channelTitle": f"Chaîne {ch}",
+                    "publishedAt": published.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    "description": chapters + "Description de la vidéo.",
+                    "tags": rng.sample(_TAGS, rng.randint(0, 6)),
+                    "defaultAudioLanguage": "en" if english else "fr",
+                    "thumbnails": {"high": {"url": f"https://i.ytimg.com/vi/{vid}/hqdefault.jpg"}},
+                },
+                "contentDetails": {"duration": f"PT{rng.randint(1, 90)}M{rng.randint(0, 59)}S"},
+                "statistics": {
+                    "viewCount": str(views),
+                    "likeCount": str(int(views * rng.uniform(0, 0.08))),
+                },
+            })
+        return {"items": items}
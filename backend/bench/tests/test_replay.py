@@ -0,0 +1,143 @@
+"""Tests du stand-in YouTube (record/replay) branché sur le client réel."""
+
+import asyncio
+import json
+
+import pytest
+
+from api import main as api_main
+from api import rescoring, storage, youtube_client
+from api.youtube_client import QuotaExceededError, fetch_all_videos
+from bench import loadgen
+from bench.replay import FakeYouTube, RecordingTransport, load_recordings, recorded_queries
+from worker import scheduler
+
+
+@pytest.fixture(autouse=True)
+def api_key(monkeypatch):
+    monkeypatch.setenv("YOUTUBE_API_KEY", "test")
+    yield
+    youtube_client.set_transport(None)
+
+
+def _fetch(fake: FakeYouTube, queries: list[str]) -> list[dict]:
+    youtube_client.set_transport(fake.transport())
+    return asyncio.run(fetch_all_videos(queries))
+
+
+class TestFakeYouTube:
+    def test_search_is_deterministic_per_query(self):
+        ids_a = {v["id"] for v in _fetch(FakeYouTube(non_french_ratio=0), ["a"])}
+        ids_b = {v["id"] for v in _fetch(FakeYouTube(non_french_ratio=0), ["a"])}
+        assert ids_a == ids_b
+        assert len(ids_a) == 25
+
+    def test_non_french_channels_are_filtered(self):
+        videos = _fetch(FakeYouTube(channels=10, non_french_ratio=0.5), ["a", "b"])
+        assert videos
+        assert all(int(v["channel_id"][2:]) >= 5 for v in videos)
+
+    def test_quota_after_raises(self):
+        fake = FakeYouTube(quota_after=2)
+        with pytest.raises(QuotaExceededError):
+            _fetch(fake, ["a", "b", "c"])
+        assert fake.stats["search"] == 3
+
+    def test_quota_error_keeps_partial_results(self):
+        fake = FakeYouTube(non_french_ratio=0, quota_after=1)
+        query_ids: dict[str, list[str]] = {}
+        youtube_client.set_transport(fake.transport())
+        with pytest.raises(QuotaExceededError) as exc_info:
+            asyncio.run(fetch_all_videos(["a", "b"], query_ids=query_ids))
+        assert len(exc_info.value.videos) == 25
+        assert list(query_ids) == ["a"]
+
+    def test_query_ids_include_deferred_channels(self, monkeypatch):
+        slow = f"UC{0:022d}"
+
+        def prefilter(candidates, stats):
+            return ([c for c in candidates if c["channel_id"] != slow],
+                    [c for c in candidates if c["channel_id"] == slow])
+
+        monkeypatch.setattr(youtube_client, "prefilter", prefilter)
+        query_ids: dict[str, list[str]] = {}
+        youtube_client.set_transport(FakeYouTube(channels=4, non_french_ratio=0).transport())
+        videos = asyncio.run(fetch_all_videos(["a", "b"], {}, query_ids))
+
+        assert list(query_ids) == ["a", "b"]
+        assert not set(query_ids["a"]) & set(query_ids["b"])
+        # Les vidéos des chaînes différées (détaillées en fin de run) restent attribuées à leur requête
+        deferred = [v for v in videos if v["channel_id"] == slow]
+        assert deferred
+        assert {v["id"] for v in videos} == set(query_ids["a"]) | set(query_ids["b"])
+
+    def test_server_errors_are_tolerated(self):
+        fake = FakeYouTube(error_rate=1.0)
+        assert _fetch(fake, ["a", "b"]) == []
+        assert fake.stats["errors"] == 2
+
+
+class TestRecordReplay:
+    def test_recorded_responses_are_replayed(self, tmp_path):
+        path = tmp_path / "yt.jsonl"
+        origin = FakeYouTube(non_french_ratio=0)
+        youtube_client.set_transport(RecordingTransport(path, inner=origin.transport()))
+        recorded = asyncio.run(fetch_all_videos(["a"]))
+
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [rec["path"] for rec in lines] == ["/search", "/videos"]
+        assert all("key" not in rec["params"] for rec in lines)
+
+        # Un stand-in sans réponses synthétiques (pool vide) ne sert que l'enregistrement
+        replay = FakeYouTube(pool_size=0, recordings=load_recordings(path))
+        replayed = _fetch(replay, ["a"])
+        assert [v["id"] for v in replayed] == [v["id"] for v in recorded]
+        assert replay.stats["replayed"] == 2
+
+    def test_recorded_queries_keep_order(self, tmp_path):
+        path = tmp_path / "yt.jsonl"
+        youtube_client.set_transport(RecordingTransport(path, inner=FakeYouTube().transport()))
+        asyncio.run(fetch_all_videos(["b", "a"]))
+        assert recorded_queries(load_recordings(path)) == ["b", "a"]
+
+
+class TestLoadgen:
+    @pytest.fixture
+    def isolated(self, tmp_path, monkeypatch):
+        # Les modules sont déjà importés : DATA_PATH ne suffit pas, les chemins sont redirigés ici
+        for name in ("DATA_PATH", "CONFIG_PATH", "QUOTA_PATH", "CHANNELS_PATH",
+                     "RELATED_PATH", "RAW_PATH", "CATALOG_META_PATH"):
+            monkeypatch.setattr(storage, name, tmp_path / getattr(storage, name).name)
+        monkeypatch.setenv("DATA_PATH", str(tmp_path / "videos.json"))
+        monkeypatch.setenv("THUMBNAIL_PREFETCH_COUNT", "0")
+
+        async def no_prefetch(videos, *args, **kwargs):
+            return 0
+
+        monkeypatch.setattr(api_main, "prefetch_thumbnails", no_prefetch)
+        monkeypatch.setattr(scheduler, "prefetch_thumbnails", no_prefetch)
+        # loadgen remplace les fonctions chronométrées : elles sont restaurées après le test
+        for module in (youtube_client, rescoring, scheduler, api_main):
+            for name in ("search_videos", "get_video_details", "score_all", "save_raw_videos",
+                         "save_videos", "fetch_all_videos", "persist_catalog", "load_channel_stats",
+                         "record_accepted", "save_channel_stats", "compute_related", "save_related"):
+                if hasattr(module, name):
+                    monkeypatch.setattr(module, name, getattr(module, name))
+        return tmp_path
+
+    def test_replay_uses_recorded_queries(self, isolated):
+        path = isolated / "yt.jsonl"
+        youtube_client.set_transport(
+            RecordingTransport(path, inner=FakeYouTube(non_french_ratio=0).transport())
+        )
+        asyncio.run(fetch_all_videos(["a", "b"]))
+
+        results = loadgen.main([
+            "--replay", str(path), "--queries", "8", "--pool", "0",
+            "--target", "refresh", "--data-dir", str(isolated), "--json",
+        ])
+        run = results["runs"]["_run_refresh"]
+        assert results["queries"] == 2
+        assert run["error"] is None
+        assert run["fake_api"]["replayed"] > 0
+        assert run["stored"] > 0
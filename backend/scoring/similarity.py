@@ -0,0 +1,182 @@
+"""
+Similarité de contenu entre vidéos (TF-IDF sur titre + tags).
+
+Les k plus proches voisins de chaque vidéo sont précalculés pendant le
+pipeline, par blocs de lignes pour borner la mémoire, afin que la route
+"vidéos similaires" n'ait qu'une liste à lire.
+
+Index produit (sérialisable en JSON) :
+    {
+        "fingerprints": {video_id: empreinte du texte},
+        "neighbours": {video_id: [[voisin_id, similarité], ...]},
+    }
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+from typing import Any
+
+import numpy as np
+from scipy import sparse
+
+TOP_K = 10
+MIN_SIMILARITY = 0.05
+# Nombre max de cellules de la matrice de similarité dense calculées à la fois (~16 Mo en float32)
+BLOCK_CELLS = 4_000_000
+# Au-delà de cette part de vidéos modifiées, recalcul complet plutôt qu'incrémental
+INCREMENTAL_MAX_RATIO = 0.2
+
+_TOKEN_RE = re.compile(r"\w[\w\-/]+", re.UNICODE)
+_STOPWORDS = {
+    "le", "la", "les", "un", "une", "des", "de", "du", "et", "en", "au", "aux", "pour",
+    "sur", "avec", "dans", "par", "est", "qui", "que", "on", "pas", "ce", "ces", "vous",
+    "the", "and", "for", "with", "to", "of", "in", "on", "how", "what", "your",
+}
+
+
+def _tokens(video: dict[str, Any]) -> list[str]:
+    text = f"{video.get('title', '')} {' '.join(video.get('tags', []))}".lower()
+    return [t for t in _TOKEN_RE.findall(text) if t not in _STOPWORDS]
+
+
+def _fingerprint(video: dict[str, Any]) -> str:
+    text = f"{video.get('title', '')}\x00{'|'.join(video.get('tags', []))}"
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def tfidf_matrix(videos: list[dict[str, Any]]) -> sparse.csr_matrix:
+    """Matrice creuse (vidéos × termes) TF-IDF, lignes normalisées L2."""
+    vocab: dict[str, int] = {}
+    indptr = [0]
+    indices: list[int] = []
+    data: list[float] = []
+    for v in videos:
+        counts: dict[int, int] = {}
+        for tok in _tokens(v):
+            j = vocab.setdefault(tok, len(vocab))
+            counts[j] = counts.get(j, 0) + 1
+        indices.extend(counts)
+        data.extend(1.0 + math.log(c) for c in counts.values())
+        indptr.append(len(indices))
+
+    n = len(videos)
+    tf = sparse.csr_matrix(
+        (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int32), indptr),
+        shape=(n, max(len(vocab), 1)),
+    )
+    df = np.bincount(tf.indices, minlength=tf.shape[1])
+    idf = (np.log((1 + n) / (1 + df)) + 1).astype(np.float32)
+    x = tf @ sparse.diags(idf)
+
+    norms = np.sqrt(np.asarray(x.multiply(x).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.csr_matrix(sparse.diags(1 / norms) @ x, dtype=np.float32)
+
+
+def _blocks(x: sparse.csr_matrix, rows: np.ndarray):
+    """Produit (lignes, similarités denses lignes × toutes les vidéos) par blocs bornés en mémoire."""
+    n, vocab = x.shape
+    block = max(1, BLOCK_CELLS // max(n, vocab, 1))
+    for start in range(0, len(rows), block):
+        chunk = rows[start : start + block]
+        # Creuse × dense : bien plus rapide que creuse × creuse, le résultat étant dense
+        sims = np.ascontiguousarray((x @ x[chunk].T.toarray()).T)
+        sims[np.arange(len(chunk)), chunk] = -1.0  # pas la vidéo elle-même
+        yield chunk, sims
+
+
+def _block_neighbours(sims: np.ndarray, ids: list[str], kk: int) -> list[list[list[Any]]]:
+    """Listes de voisins de chaque ligne d'un bloc : sélection top-k vectorisée sur tout le bloc."""
+    top = np.argpartition(-sims, kk - 1, axis=1)[:, :kk]
+    top_s = np.take_along_axis(sims, top, axis=1)
+    order = np.argsort(-top_s, axis=1, kind="stable")
+    top = np.take_along_axis(top, order, axis=1).tolist()
+    top_s = np.round(np.take_along_axis(top_s, order, axis=1).astype(np.float64), 4).tolist()
+    return [
+        [[ids[c], sim] for c, sim in zip(cols, row_s) if sim >= MIN_SIMILARITY]
+        for cols, row_s in zip(top, top_s)
+    ]
+
+
+def _top_k_rows(
+    x: sparse.csr_matrix, rows: np.ndarray, ids: list[str], k: int
+) -> dict[str, list[list[Any]]]:
+    """k plus proches voisins (cosinus) des lignes `rows`, calculés par blocs."""
+    kk = min(k, x.shape[0] - 1)
+    if kk < 1:
+        return {ids[r]: [] for r in rows}
+    result: dict[str, list[list[Any]]] = {}
+    for chunk, sims in _blocks(x, rows):
+        result.update(zip((ids[r] for r in chunk), _block_neighbours(sims, ids, kk)))
+    return result
+
+
+def compute_related(
+    videos: list[dict[str, Any]],
+    previous: dict[str, Any] | None = None,
+    k: int = TOP_K,
+) -> dict[str, Any]:
+    """
+    Calcule l'index des vidéos similaires.
+
+    Si `previous` est fourni et que peu de vidéos ont changé (titre/tags),
+    seules les lignes des vidéos nouvelles ou modifiées, et celles qui
+    perdent un voisin supprimé ou modifié, sont recalculées ; les listes des
+    autres vidéos sont fusionnées avec leurs meilleures similarités envers
+    les vidéos modifiées (les scores des paires inchangées ne sont pas
+    réactualisés avec le nouvel IDF).
+    """
+    ids = [v["id"] for v in videos]
+    fingerprints = {v["id"]: _fingerprint(v) for v in videos}
+    x = tfidf_matrix(videos)
+    n = len(ids)
+
+    old_fp = (previous or {}).get("fingerprints", {})
+    old_nb = (previous or {}).get("neighbours", {})
+    changed = np.asarray(
+        [i for i, vid in enumerate(ids) if old_fp.get(vid) != fingerprints[vid]], dtype=np.int64
+    )
+    removed = set(old_fp) - set(fingerprints)
+
+    kk = min(k, n - 1)
+    if not old_nb or kk < 1 or len(changed) > INCREMENTAL_MAX_RATIO * n:
+        return {"fingerprints": fingerprints, "neighbours": _top_k_rows(x, np.arange(n), ids, k)}
+
+    neighbours: dict[str, list[list[Any]]] = {}
+    # Meilleures similarités de chaque vidéo envers les vidéos modifiées (matrice symétrique)
+    best_s = np.full((n, kk), -1.0, dtype=np.float32)
+    best_c = np.full((n, kk), -1, dtype=np.int64)
+    for chunk, sims in _blocks(x, changed):
+        neighbours.update(zip((ids[r] for r in chunk), _block_neighbours(sims, ids, kk)))
+        m = min(kk, len(chunk))
+        idx = np.argpartition(-sims, m - 1, axis=0)[:m] if len(chunk) > m else np.indices(sims.shape)[0]
+        cand_s = np.concatenate([best_s, np.take_along_axis(sims, idx, axis=0).T], axis=1)
+        cand_c = np.concatenate([best_c, chunk[idx].T], axis=1)
+        sel = np.argpartition(-cand_s, kk - 1, axis=1)[:, :kk]
+        best_s = np.take_along_axis(cand_s, sel, axis=1)
+        best_c = np.take_along_axis(cand_c, sel, axis=1)
+
+    changed_ids = {ids[r] for r in changed}
+    stale = changed_ids | removed
+    refill = []
+    for i, vid in enumerate(ids):
+        if vid in changed_ids:
+            continue
+        old = old_nb.get(vid, [])
+        candidates = {nid: s for nid, s in old if nid not in stale}
+        for s, c in zip(best_s[i], best_c[i]):
+            if c >= 0 and s >= MIN_SIMILARITY:
+                candidates[ids[c]] = round(float(s), 4)
+        best = sorted(candidates.items(), key=lambda c: c[1], reverse=True)[:k]
+        neighbours[vid] = [[nid, s] for nid, s in best]
+        # Un voisin supprimé ou modifié libère une place que seule une vidéo inchangée
+        # hors de l'ancienne liste peut occuper : la ligne est recalculée entièrement
+        if any(nid in stale for nid, _ in old):
+            refill.append(i)
+
+    if refill:
+        neighbours.update(_top_k_rows(x, np.asarray(refill, dtype=np.int64), ids, k))
+    return {"fingerprints": fingerprints, "neighbours": neighbours}
@@ -0,0 +1,98 @@
+"""Tests de l'index des vidéos similaires."""
+
+import random
+
+import numpy as np
+from scipy import sparse
+
+from scoring import similarity
+from scoring.similarity import compute_related, tfidf_matrix
+
+
+def _video(video_id: str, title: str, tags: list[str] | None = None) -> dict:
+    return {"id": video_id, "title": title, "tags": tags or []}
+
+
+CATALOG = [
+    _video("argo1", "ArgoCD GitOps en production", ["argocd", "gitops"]),
+    _video("argo2", "GitOps avec ArgoCD et Helm", ["argocd", "helm"]),
+    _video("prom1", "Prometheus et Grafana pour Kubernetes", ["prometheus", "grafana"]),
+    _video("prom2", "Alerting Prometheus Alertmanager", ["prometheus", "alertmanager"]),
+    _video("velero", "Backup Kubernetes avec Velero", ["velero", "backup"]),
+]
+
+
+def _ids(index: dict, video_id: str) -> list[str]:
+    return [nid for nid, _ in index["neighbours"][video_id]]
+
+
+def _tf_matrix(videos: list[dict]) -> sparse.csr_matrix:
+    """TF normalisé sans IDF : similarités indépendantes du reste du catalogue."""
+    vocab: dict[str, int] = {}
+    rows, cols = [], []
+    for i, v in enumerate(videos):
+        for tok in set(similarity._tokens(v)):
+            rows.append(i)
+            cols.append(vocab.setdefault(tok, len(vocab)))
+    x = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=(len(videos), max(len(vocab), 1))
+    )
+    norms = np.sqrt(np.asarray(x.sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.csr_matrix(sparse.diags(1 / norms) @ x, dtype=np.float32)
+
+
+def _random_catalog(prefix: str, count: int, rng: random.Random) -> list[dict]:
+    words = [f"mot{i}" for i in range(60)]
+    return [_video(f"{prefix}{i}", " ".join(rng.sample(words, 5))) for i in range(count)]
+
+
+class TestTfidfMatrix:
+    def test_rows_are_normalized(self):
+        x = tfidf_matrix(CATALOG)
+        norms = x.multiply(x).sum(axis=1)
+        assert all(abs(n - 1.0) < 1e-5 for n in norms.A1)
+
+
+class TestComputeRelated:
+    def test_nearest_neighbour_shares_topic(self):
+        index = compute_related(CATALOG)
+        assert _ids(index, "argo1")[0] == "argo2"
+        assert _ids(index, "prom2")[0] == "prom1"
+
+    def test_video_is_not_its_own_neighbour(self):
+        index = compute_related(CATALOG)
+        assert all(vid not in _ids(index, vid) for vid in index["neighbours"])
+
+    def test_blocked_computation_matches(self, monkeypatch):
+        expected = compute_related(CATALOG)
+        monkeypatch.setattr(similarity, "BLOCK_CELLS", 1)
+        assert compute_related(CATALOG) == expected
+
+    def test_incremental_update_adds_new_video(self, monkeypatch):
+        monkeypatch.setattr(similarity, "INCREMENTAL_MAX_RATIO", 0.5)
+        previous = compute_related(CATALOG)
+        catalog = CATALOG[1:] + [_video("argo3", "ArgoCD GitOps multi-cluster", ["argocd"])]
+        index = compute_related(catalog, previous)
+        assert "argo1" not in index["neighbours"]
+        assert _ids(index, "argo3")[0] == "argo2"
+        assert "argo3" in _ids(index, "argo2")
+        assert all("argo1" not in _ids(index, vid) for vid in index["neighbours"])
+
+    def test_unchanged_catalog_reuses_previous(self):
+        previous = compute_related(CATALOG)
+        assert compute_related(CATALOG, previous) == previous
+
+    def test_incremental_matches_full_after_remove_and_add(self, monkeypatch):
+        # IDF neutralisé : seule la logique incrémentale est comparée au recalcul complet
+        monkeypatch.setattr(similarity, "tfidf_matrix", _tf_matrix)
+        rng = random.Random(7)
+        catalog = _random_catalog("v", 200, rng)
+        previous = compute_related(catalog)
+        catalog = catalog[5:] + _random_catalog("new", 5, rng)
+
+        index = compute_related(catalog, previous)
+        full = compute_related(catalog)
+        for vid, neighbours in full["neighbours"].items():
+            # Comparaison des similarités : l'ordre des ex-aequo n'est pas garanti
+            assert [s for _, s in index["neighbours"][vid]] == [s for _, s in neighbours], vid
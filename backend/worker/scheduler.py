@@ -1,23 +1,35 @@
 """
-Worker cron — Veille YouTube Kubernetes.
-Mise à jour quotidienne à 6h UTC via APScheduler.
+Worker — Veille YouTube Kubernetes.
+Planification adaptative par requête via APScheduler : chaque requête a son
+propre intervalle selon son rendement, les exécutions sont étalées sur la
+journée et plafonnées par un débit global (voir api/schedule.py).
 """
 
 import asyncio
 import logging
 import os
-from datetime import datetime, timezone
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Callable
 
 from apscheduler.schedulers.blocking import BlockingScheduler
-from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 
 # Ajout du répertoire parent au path Python
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from api.storage import save_videos, load_config
-from api.youtube_client import fetch_all_videos
-from scoring.scorer import score_video
+from api.storage import (
+    catalog_lock, load_videos, load_raw_videos, load_config, load_channel_stats,
+    save_channel_stats, load_schedule, save_schedule, save_quota_status, load_related, save_related,
+)
+from api.channels import record_accepted
+from api.youtube_client import fetch_all_videos, QuotaExceededError
+from api.rescoring import persist_catalog, strip_derived
+from api.thumbnails import prefetch_thumbnails
+from api.profiling import SamplingProfiler, save_profile
+from api import schedule
+from scoring.similarity import compute_related
 
 logging.basicConfig(
     level=logging.INFO,
@@ -25,27 +37,49 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Fréquence de réveil du scheduler (les requêtes dues sont exécutées à chaque tick)
+TICK_MINUTES = 5
+# Fenêtre de rétention des vidéos, alignée sur publishedAfter de la recherche
+RETENTION_DAYS = 30
+
+# Profil collapsed de chaque exécution des requêtes dues, écrit sous data/profiles/
+PROFILE_PIPELINE = os.environ.get("PROFILE_PIPELINE", "") == "1"
+
+_rng = random.Random()
+
+
+def run_pipeline(profile: bool = False) -> None:
+    """
+    Pipeline complet : fetch → score → persist → miniatures.
+    Si profile=True, un profil collapsed de l'exécution est écrit sous data/profiles/.
+    """
+    if profile:
+        with SamplingProfiler() as prof:
+            run_pipeline()
+        path = save_profile("pipeline", prof.collapsed())
+        logger.info("Profil du pipeline enregistré : %s (%.1fs)", path, prof.duration)
+        return
 
-def run_pipeline() -> None:
-    """Pipeline complet : fetch → score → persist."""
     logger.info("=== Démarrage du pipeline de mise à jour ===")
     start = datetime.now(timezone.utc)
 
     try:
         config = load_config()
         queries = config.get("queries")
-        raw = asyncio.run(fetch_all_videos(queries))
+        channel_stats = load_channel_stats()
+        raw = asyncio.run(fetch_all_videos(queries, channel_stats))
         logger.info("Vidéos récupérées : %d", len(raw))
 
-        scored = []
-        for v in raw:
-            s, topics = score_video(v)
-            v["score"] = s
-            v["topics"] = topics
-            scored.append(v)
+        with catalog_lock():
+            scored = persist_catalog(raw)
 
-        scored.sort(key=lambda x: x["score"], reverse=True)
-        save_videos(scored)
+        record_accepted(channel_stats, scored)
+        save_channel_stats(channel_stats)
+
+        save_related(compute_related(scored, load_related()))
+
+        cached = asyncio.run(prefetch_thumbnails(scored))
+        logger.info("Miniatures préchargées : %d", cached)
 
         elapsed = (datetime.now(timezone.utc) - start).total_seconds()
         logger.info(
@@ -57,17 +91,147 @@ def run_pipeline() -> None:
         logger.error("Erreur pipeline : %s", exc, exc_info=True)
 
 
-if __name__ == "__main__":
-    # Exécution immédiate au démarrage puis cron quotidien
-    logger.info("Worker démarré — exécution immédiate puis cron à 6h UTC")
-    run_pipeline()
+def _is_recent(video: dict, cutoff: datetime) -> bool:
+    try:
+        dt = datetime.fromisoformat(str(video.get("published_at", "")).replace("Z", "+00:00"))
+    except ValueError:
+        return True
+    return dt >= cutoff
+
+
+def _load_raw_store() -> list[dict]:
+    raw_store = load_raw_videos()
+    if raw_store is None:
+        raw_store = [strip_derived(v) for v in load_videos()]
+    return raw_store
+
+
+def run_queries(
+    queries: list[str],
+    profile: bool = False,
+    on_fetched: Callable[[dict[str, int], bool], None] | None = None,
+) -> tuple[dict[str, int], bool]:
+    """
+    Exécute un sous-ensemble de requêtes et fusionne le résultat dans le stockage.
+    Retourne (nouvelles vidéos par requête, quota dépassé).
+    on_fetched(rendements, quota dépassé) est appelé dès la fin des appels YouTube,
+    avant la persistance.
+    Si profile=True, un profil collapsed de l'exécution est écrit sous data/profiles/.
+    """
+    if profile:
+        with SamplingProfiler() as prof:
+            result = run_queries(queries, on_fetched=on_fetched)
+        path = save_profile("tick", prof.collapsed())
+        logger.info("Profil du tick enregistré : %s (%.1fs)", path, prof.duration)
+        return result
+
+    existing = {v["id"] for v in _load_raw_store()}
+    channel_stats = load_channel_stats()
+    quota_exceeded = False
+
+    # Un seul run pour toutes les requêtes : les chaînes différées passent en fin de run
+    query_ids: dict[str, list[str]] = {}
+    try:
+        raw = asyncio.run(fetch_all_videos(queries, channel_stats, query_ids))
+    except QuotaExceededError as exc:
+        raw = exc.videos
+        quota_exceeded = True
+    fresh = {v["id"]: v for v in raw}
+
+    # Rendement attribué à la requête qui a trouvé chaque vidéo, différées comprises
+    yields = {
+        query: sum(1 for vid in ids if vid in fresh and vid not in existing)
+        for query, ids in query_ids.items()
+    }
+    if on_fetched is not None:
+        on_fetched(yields, quota_exceeded)
+
+    if fresh:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=RETENTION_DAYS)
+        # Stockage relu sous verrou : un rescoring de l'API a pu le réécrire pendant le fetch
+        with catalog_lock():
+            merged = {v["id"]: v for v in _load_raw_store()}
+            merged.update(fresh)
+            scored = persist_catalog([v for v in merged.values() if _is_recent(v, cutoff)])
+
+        # Entrées scorées : `fresh` ne contient que les champs bruts (score absent)
+        record_accepted(channel_stats, [v for v in scored if v["id"] in fresh])
+        save_channel_stats(channel_stats)
+
+        save_related(compute_related(scored, load_related()))
 
+        cached = asyncio.run(prefetch_thumbnails(scored))
+        logger.info("Miniatures préchargées : %d", cached)
+
+    return yields, quota_exceeded
+
+
+def tick() -> None:
+    """Exécute les requêtes arrivées à échéance dans la limite du débit global."""
+    state = load_schedule()
+    now = datetime.now(timezone.utc)
+    schedule.sync_queries(state, load_config().get("queries", []), now, _rng)
+
+    due = schedule.due_queries(state, now)
+    if not due:
+        save_schedule(state)
+        return
+
+    def record_runs(yields: dict[str, int], quota_exceeded: bool) -> None:
+        # Enregistré avant la persistance : une erreur en aval ne relance pas les recherches
+        for query, new_count in yields.items():
+            schedule.record_run(state, query, new_count, now, _rng)
+            logger.info(
+                "Requête '%s' : %d nouvelles vidéos, prochain passage dans %.1fh",
+                query, new_count, state["queries"][query]["interval_hours"],
+            )
+        if not quota_exceeded:
+            # Requêtes en erreur : pas replanifiées (retentées au prochain tick) mais décomptées
+            for query in set(due) - set(yields):
+                schedule.record_attempt(state, now)
+        if quota_exceeded:
+            schedule.pause_until_quota_reset(state, now)
+            logger.warning("Quota YouTube dépassé — pause jusqu'à %s", state["paused_until"])
+        save_quota_status(quota_exceeded)
+        save_schedule(state)
+
+    logger.info("Requêtes dues : %s", ", ".join(due))
+    try:
+        run_queries(due, profile=PROFILE_PIPELINE, on_fetched=record_runs)
+    except Exception as exc:
+        logger.error("Erreur pipeline : %s", exc, exc_info=True)
+    save_schedule(state)
+
+
+def log_schedule() -> None:
+    """Affiche les prochaines exécutions planifiées."""
+    for item in schedule.upcoming(load_schedule())[:10]:
+        logger.info(
+            "  %s → '%s' (toutes les %.1fh, rendement %.1f)",
+            item["next_run"], item["query"], item["interval_hours"], item["yield_avg"],
+        )
+
+
+if __name__ == "__main__":
+    logger.info(
+        "Worker démarré — planification adaptative, %d recherches/h max",
+        schedule.MAX_SEARCHES_PER_HOUR,
+    )
     scheduler = BlockingScheduler(timezone="UTC")
     scheduler.add_job(
-        run_pipeline,
-        trigger=CronTrigger(hour=6, minute=0),
-        id="daily_refresh",
-        name="Mise à jour quotidienne des vidéos",
+        tick,
+        trigger=IntervalTrigger(minutes=TICK_MINUTES),
+        next_run_time=datetime.now(timezone.utc),
+        id="adaptive_refresh",
+        name="Exécution des requêtes arrivées à échéance",
+        max_instances=1,
+        coalesce=True,
+    )
+    scheduler.add_job(
+        log_schedule,
+        trigger=IntervalTrigger(hours=1),
+        id="log_schedule",
+        name="Journalisation du planning",
     )
-    logger.info("Scheduler configuré : cron 6h00 UTC")
+    logger.info("Scheduler configuré : tick toutes les %d min", TICK_MINUTES)
     scheduler.start()
@@ -0,0 +1,91 @@
+"""Tests du worker (exécution des requêtes dues contre l'API YouTube simulée)."""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+from api import storage, youtube_client
+from api.channels import summarize
+from bench.replay import FakeYouTube
+from worker import scheduler
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    for name in ("DATA_PATH", "CONFIG_PATH", "QUOTA_PATH", "CHANNELS_PATH", "SCHEDULE_PATH",
+                 "RELATED_PATH", "RAW_PATH", "CATALOG_META_PATH"):
+        monkeypatch.setattr(storage, name, tmp_path / getattr(storage, name).name)
+    monkeypatch.setenv("YOUTUBE_API_KEY", "test")
+
+    async def no_prefetch(videos, *args, **kwargs):
+        return 0
+
+    monkeypatch.setattr(scheduler, "prefetch_thumbnails", no_prefetch)
+    yield tmp_path
+    youtube_client.set_transport(None)
+
+
+class TestRunQueries:
+    def test_channel_reputation_uses_scores(self):
+        youtube_client.set_transport(FakeYouTube(channels=3, non_french_ratio=0).transport())
+        yields, quota_exceeded = scheduler.run_queries(["a", "b", "c"])
+        assert not quota_exceeded
+        assert sum(yields.values()) > 0
+
+        scores = {v["channel_id"]: [] for v in storage.load_videos()}
+        for v in storage.load_videos():
+            scores[v["channel_id"]].append(v["score"])
+        for channel_id, entry in storage.load_channel_stats().items():
+            summary = summarize(channel_id, entry)
+            assert summary["mean_score"] > 0
+            assert summary["mean_score"] == pytest.approx(
+                sum(scores[channel_id]) / len(scores[channel_id]), abs=0.1
+            )
+
+
+def _schedule_due(queries: list[str]) -> None:
+    storage.save_config({"queries": queries})
+    state = storage.load_schedule()
+    past = datetime.now(timezone.utc) - timedelta(days=1)
+    scheduler.schedule.sync_queries(state, queries, past, random.Random(0))
+    storage.save_schedule(state)
+
+
+class TestTick:
+    def test_runs_recorded_when_persistence_fails(self, monkeypatch):
+        monkeypatch.setattr(scheduler.schedule, "MAX_SEARCHES_PER_HOUR", 10)
+        _schedule_due(["a", "b"])
+        youtube_client.set_transport(FakeYouTube(non_french_ratio=0).transport())
+
+        def broken(*args, **kwargs):
+            raise OSError("disque plein")
+
+        monkeypatch.setattr(scheduler, "persist_catalog", broken)
+        scheduler.tick()
+
+        state = storage.load_schedule()
+        assert len(state["recent_runs"]) == 2
+        assert all(entry["last_run"] for entry in state["queries"].values())
+        assert scheduler.schedule.due_queries(state, datetime.now(timezone.utc)) == []
+
+    def test_errored_query_is_not_rescheduled(self, monkeypatch):
+        monkeypatch.setattr(scheduler.schedule, "MAX_SEARCHES_PER_HOUR", 10)
+        _schedule_due(["a", "b"])
+        fake = FakeYouTube(non_french_ratio=0)
+        handle = fake._handle
+
+        async def failing_b(request):
+            if request.url.params.get("q") == "b":
+                return httpx.Response(500, json={"error": {"code": 500}})
+            return await handle(request)
+
+        youtube_client.set_transport(httpx.MockTransport(failing_b))
+        scheduler.tick()
+
+        state = storage.load_schedule()
+        assert state["queries"]["a"]["last_run"]
+        assert state["queries"]["b"]["last_run"] is None
+        # La recherche en erreur compte tout de même dans le débit global
+        assert len(state["recent_runs"]) == 2
@@ -1,7 +1,7 @@
 "use client";
 
 import type { Video } from "@/lib/api";
-import { formatDuration, formatDate, TOPICS } from "@/lib/api";
+import { formatDuration, formatDate, thumbnailUrl, TOPICS } from "@/lib/api";
 import Image from "next/image";
 
 interface Props {
@@ -25,7 +25,7 @@ export default function VideoCard({ video }: Props) {
             <div className="video-card__thumb">
                 {video.thumbnail_url ? (
                     <Image
-                        src={video.thumbnail_url}
+                        src={thumbnailUrl(video.id)}
                         alt={video.title}
                         fill
                         style={{ objectFit: "cover" }}
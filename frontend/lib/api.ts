@@ -4,6 +4,7 @@ export interface Video {
     id: string;
     title: string;
     channel: string;
+    channel_id: string;
     published_at: string;
     duration_seconds: number;
     view_count: number;
@@ -46,6 +47,16 @@ export async function fetchVideos(filters: Filters = {}): Promise<VideoList> {
     return res.json();
 }
 
+export interface RelatedVideo extends Video {
+    similarity: number;
+}
+
+export async function fetchRelatedVideos(videoId: string, limit = 10): Promise<RelatedVideo[]> {
+    const res = await fetch(`${API_BASE}/api/videos/${encodeURIComponent(videoId)}/related?limit=${limit}`, { next: { revalidate: 300 } });
+    if (!res.ok) throw new Error("Erreur lors du chargement des vidéos similaires");
+    return res.json();
+}
+
 export async function triggerRefresh(queries?: string[]): Promise<void> {
     const body = queries ? JSON.stringify({ queries }) : undefined;
     await fetch(`${API_BASE}/api/refresh`, {
@@ -61,12 +72,16 @@ export async function fetchConfig(): Promise<{ queries: string[] }> {
     return res.json();
 }
 
-export async function fetchStatus(): Promise<{ video_count: number; last_updated: string | null; refresh_running: boolean; quota_exceeded: boolean; quota_exceeded_at: string | null }> {
+export async function fetchStatus(): Promise<{ video_count: number; last_updated: string | null; refresh_running: boolean; quota_exceeded: boolean; quota_exceeded_at: string | null; scoring_fingerprint: string | null; scoring_stale: boolean }> {
     const res = await fetch(`${API_BASE}/api/status`, { cache: "no-store" });
     if (!res.ok) throw new Error("Erreur status");
     return res.json();
 }
 
+export function thumbnailUrl(videoId: string, width = 480): string {
+    return `${API_BASE}/api/thumbnails/${encodeURIComponent(videoId)}?w=${width}`;
+}
+
 export function formatDuration(seconds: number): string {
     const h = Math.floor(seconds / 3600);
     const m = Math.floor((seconds % 3600) / 60);